@@ -0,0 +1,142 @@
+"""Cold-start benchmark for the main window.
+
+Times each startup phase in a fresh interpreter per history size and
+writes the results as JSON:
+
+    python -m benchmarks.startup --sizes 10 1000 10000 100000 --output startup.json
+
+GUI phases need a display. Without one the harness starts Xvfb when it
+is installed, otherwise those phases are reported as skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from src.utils.synthetic import HistoryConfig, load_history
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SIZES = (10, 1_000, 10_000, 100_000)
+
+
+def _timed(phases: dict, name: str, func):
+    start = time.perf_counter()
+    result = func()
+    phases[name] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def run_child(storage: str, gui: bool) -> dict:
+    """Time the startup phases in this process; the working directory holds data/"""
+    phases = {}
+    _timed(phases, "import_database", lambda: __import__("src.utils.database"))
+    database = sys.modules["src.utils.database"]
+    database.STORAGE_BACKEND = storage
+
+    db = _timed(phases, "database_init", database.Database)
+    _timed(phases, "load_sessions", db.count_sessions)
+    if not gui:
+        return {"phases": phases, "gui": "disabled"}
+
+    try:
+        _timed(phases, "import_main_window", lambda: __import__("src.gui.main_window"))
+        from src.gui.main_window import MainWindow
+        database.session_cache.invalidate()
+        app = _timed(phases, "main_window", lambda: MainWindow(db))
+    except Exception as e:
+        return {"phases": phases, "gui": f"skipped: {e}"}
+
+    _timed(phases, "first_paint", app.update)
+    _timed(phases, "refresh_sessions_list", app.refresh_sessions_list)
+    database.session_cache.invalidate()
+    _timed(phases, "refresh_sessions_list_cold", app.refresh_sessions_list)
+    app.destroy()
+    return {"phases": phases, "gui": "ok"}
+
+
+def start_display():
+    """Return (env, Xvfb process) giving the children a display, or (env, None)"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    if env.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return env, None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return env, None
+    display = ":97"
+    process = subprocess.Popen(
+        [xvfb, display, "-screen", "0", "1280x1024x24"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    time.sleep(0.5)
+    env["DISPLAY"] = display
+    return env, process
+
+
+def run(sizes, storage: str = "json", gui: bool = True, seed: int = 0) -> dict:
+    env, xvfb = start_display()
+    gui_note = None
+    if gui and not (env.get("DISPLAY") or sys.platform in ("win32", "darwin")):
+        gui, gui_note = False, "skipped: no display (set DISPLAY or install Xvfb)"
+    results = []
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                config = HistoryConfig(sessions=size, seed=seed, end=date.today())
+                load_history(Path(tmp) / "data", config, storage)
+                command = [sys.executable, "-m", "benchmarks.startup", "--child", "--storage", storage]
+                if not gui:
+                    command.append("--no-gui")
+                start = time.perf_counter()
+                output = subprocess.run(
+                    command, cwd=tmp, env=env, capture_output=True, text=True, check=True
+                ).stdout
+                total = (time.perf_counter() - start) * 1000
+            result = json.loads(output.strip().splitlines()[-1])
+            result.update(sessions=size, process_ms=round(total, 3))
+            if gui_note:
+                result["gui"] = gui_note
+            results.append(result)
+    finally:
+        if xvfb:
+            xvfb.terminate()
+
+    return {
+        "benchmark": "startup",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "storage": storage,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--storage", default="json", choices=("json", "journal", "sqlite"))
+    parser.add_argument("--no-gui", action="store_true", help="only time imports and storage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the JSON here instead of stdout")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.storage, not args.no_gui)))
+        return
+
+    report = json.dumps(run(args.sizes, args.storage, not args.no_gui, args.seed), indent=2)
+    if args.output:
+        args.output.write_text(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
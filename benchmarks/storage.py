@@ -0,0 +1,208 @@
+"""Storage-layer micro-benchmarks for every Database operation.
+
+Times each operation on a synthetic history per backend and size, then
+repeats it once under tracemalloc for its peak memory, and writes the
+results as JSON (or a table with --table):
+
+    python -m benchmarks.storage --sizes 100 1000 10000 --backends json sqlite --table
+
+Every backend also times building and reading the memory-mapped
+snapshot, and SQLite the legacy src.data.database.Database
+add_session/get_all_sessions used by the history view.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from src.utils import database
+from src.utils.mapped import MappedSessions
+from src.utils.synthetic import HistoryConfig, generate, load_history
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+BACKENDS = ("json", "journal", "sqlite")
+
+
+def measure(operation, repeat: int, setup=None) -> dict:
+    """Latency percentiles and throughput of ``operation(setup())``, plus its peak memory"""
+    setup = setup or (lambda: None)
+    times = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        operation(argument)
+        times.append(time.perf_counter() - start)
+
+    # Traced separately: tracemalloc slows the timed runs down several times
+    tracemalloc.start()
+    try:
+        argument = setup()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        operation(argument)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    mean = statistics.fmean(times)
+    return {
+        "repeat": repeat,
+        "min_ms": round(times[0] * 1000, 3),
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "p95_ms": round(times[min(int(len(times) * 0.95), len(times) - 1)] * 1000, 3),
+        "mean_ms": round(mean * 1000, 3),
+        "ops_per_s": round(1 / mean, 1) if mean else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _new_sessions(seed: int):
+    """Fresh sessions to save, without the ids the Database assigns"""
+    for session in generate(HistoryConfig(sessions=10 ** 9, seed=seed + 1)):
+        del session["id"], session["created_at"]
+        yield session
+
+
+def bench_backend(storage: str, size: int, repeat: int = 20, seed: int = 0) -> dict:
+    """Time every Database operation on a ``size`` session history"""
+    rng = random.Random(seed)
+    operations = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        load_history(tmp, HistoryConfig(sessions=size, seed=seed), storage)
+        load_s = time.perf_counter() - start
+
+        db = database.Database(data_dir=tmp, storage=storage)
+        try:
+            new_sessions = _new_sessions(seed)
+            ids = list(range(1, size + 1))
+            rng.shuffle(ids)
+            # Deletes take distinct ids off the end, updates and reads use the rest
+            deleted = [ids.pop() for _ in range(min(repeat + 1, size // 2))]
+            delete_ids = iter(deleted)
+
+            def cold(operation):
+                def run(argument):
+                    database.session_cache.invalidate()
+                    return operation(argument)
+                return run
+
+            def edited():
+                session = database.thaw(db.get_session(rng.choice(ids)))
+                session["notes"] = f"edited {rng.random():.6f}"
+                return session
+
+            operations["get_sessions_cold"] = measure(cold(lambda _: db.get_sessions()), repeat)
+            operations["get_sessions_warm"] = measure(lambda _: db.get_sessions(), repeat)
+            operations["get_session_cold"] = measure(
+                cold(db.get_session), repeat, lambda: rng.choice(ids)
+            )
+            operations["get_session_warm"] = measure(db.get_session, repeat, lambda: rng.choice(ids))
+            operations["count_sessions"] = measure(lambda _: db.count_sessions(), repeat)
+            operations["save_session"] = measure(db.save_session, repeat, lambda: next(new_sessions))
+            operations["update_session"] = measure(db.update_session, repeat, edited)
+            if deleted:
+                operations["delete_session"] = measure(
+                    db.delete_session, len(deleted) - 1, lambda: next(delete_ids)
+                )
+
+            def drop_snapshots():
+                for path in Path(tmp).glob("sessions.*.map"):
+                    path.unlink()
+
+            operations["mapped_build"] = measure(
+                lambda _: db.mapped_sessions().close(), repeat, drop_snapshots
+            )
+            with db.mapped_sessions() as mapped:
+                snapshot = mapped.path
+            operations["mapped_open"] = measure(lambda _: MappedSessions(snapshot).close(), repeat)
+            with MappedSessions(snapshot) as mapped:
+                operations["mapped_get_index"] = measure(
+                    mapped.__getitem__, repeat, lambda: rng.randrange(len(mapped))
+                )
+                operations["mapped_get_id"] = measure(mapped.get, repeat, lambda: rng.choice(ids))
+        finally:
+            # Every backend: the journal keeps a file handle and a process-wide instance
+            if hasattr(db.store, "close"):
+                db.store.close()
+
+        if storage == "sqlite":
+            from src.data.database import Database as HistoryDatabase
+            history = HistoryDatabase(tmp, storage="sqlite")
+            operations["legacy_add_session"] = measure(
+                lambda _: history.add_session(1800, 1500.0, "freestyle", "benchmark"), repeat
+            )
+            operations["legacy_get_all_sessions"] = measure(
+                lambda _: history.get_all_sessions(), repeat
+            )
+            history.store.close()
+
+    database.session_cache.invalidate()
+    with database.derived_indexes_lock:
+        database.derived_indexes.clear()
+    return {
+        "storage": storage,
+        "sessions": size,
+        "bulk_load": {"seconds": round(load_s, 3), "sessions_per_s": round(size / load_s, 1)},
+        "operations": operations,
+    }
+
+
+def run(sizes, backends=BACKENDS, repeat: int = 20, seed: int = 0) -> dict:
+    results = [bench_backend(storage, size, repeat, seed) for size in sizes for storage in backends]
+    return {
+        "benchmark": "storage",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def format_table(report: dict) -> str:
+    """Median latency and peak memory per operation, one column per backend and size"""
+    results = report["results"]
+    headers = [f'{r["storage"]}@{r["sessions"]}' for r in results]
+    names = []
+    for result in results:
+        names.extend(n for n in result["operations"] if n not in names)
+
+    width = max(len(n) for n in names + ["operation"])
+    lines = ["operation".ljust(width) + "".join(f"{h:>24}" for h in headers)]
+    for name in names:
+        cells = []
+        for result in results:
+            stats = result["operations"].get(name)
+            cells.append(f'{stats["median_ms"]:>9.3f}ms {stats["peak_kib"]:>8.1f}KiB' if stats else "-")
+        lines.append(name.ljust(width) + "".join(f"{c:>24}" for c in cells))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per operation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--table", action="store_true", help="print a table instead of JSON")
+    parser.add_argument("--output", type=Path, help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.backends, args.repeat, args.seed)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.table:
+        print(format_table(report))
+    elif not args.output:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
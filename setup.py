@@ -6,6 +6,9 @@ setup(
     packages=find_packages(),
     install_requires=[
         "customtkinter>=5.2.0",
+        "darkdetect>=0.8.0",
+        "packaging>=23.0",
+        "numpy>=1.24.0",
     ],
     entry_points={
         "console_scripts": [
@@ -1,48 +1,360 @@
-import sqlite3
+import itertools
+import json
 from datetime import datetime
 from pathlib import Path
 
-class Database:
-    def __init__(self):
-        self.db_path = Path(__file__).parent / "swimming.db"
-        self.conn = None
-        self.initialize_database()
+# Session and set keys stored in their own columns, everything else goes
+# into the JSON ``extra`` column so rows round-trip to the original dicts
+SESSION_COLUMNS = ("date", "pool_length", "total_distance", "total_time", "notes", "created_at")
+SET_COLUMNS = ("distance", "time", "stroke", "repetitions", "rest", "description")
+SESSION_SELECT = "id, date, pool_length, total_distance, total_time, notes, created_at, extra"
+
+
+def _split_extra(data: dict, columns: tuple, known: tuple) -> tuple:
+    """Return the column values and a JSON blob of the remaining keys"""
+    extra = {k: v for k, v in data.items() if k not in columns and k not in known}
+    values = tuple(data.get(column) for column in columns)
+    return values, json.dumps(extra, default=str) if extra else None
+
+
+def _join_extra(columns: tuple, values: tuple, extra: str) -> dict:
+    """Rebuild a dict from column values, skipping columns that were never set"""
+    data = {k: v for k, v in zip(columns, values) if v is not None}
+    if extra:
+        data.update(json.loads(extra))
+    return data
+
+
+class SqliteStore:
+    """SQLite session store with normalized ``sessions`` and ``sets`` tables.
 
-    def initialize_database(self):
-        """Create database and tables if they don't exist"""
+    Implements the same load/insert/update/delete contract as the JSON
+    stores in src.utils.database, but single-session edits only touch
+    that session's rows.
+    """
+
+    def __init__(self, db_path: Path):
+        # Imported here so the app starts without loading SQLite until a store opens
+        import sqlite3
+        from src.data.migrations import MigrationManager
+        self.db_path = Path(db_path)
         self.conn = sqlite3.connect(self.db_path)
-        cursor = self.conn.cursor()
-
-        # Create swimming sessions table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS swimming_sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            duration INTEGER NOT NULL,
-            distance REAL NOT NULL,
-            stroke_type TEXT NOT NULL,
-            notes TEXT
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        MigrationManager(str(self.db_path)).migrate(self.conn)
+
+    @property
+    def cache_key(self):
+        return self.db_path.resolve()
+
+    def signature(self):
+        """mtime and size of the database and its write-ahead log"""
+        signature = []
+        for path in (self.db_path, self.db_path.with_name(self.db_path.name + "-wal")):
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _session_row(self, session: dict) -> tuple:
+        values, extra = _split_extra(session, SESSION_COLUMNS, ("id", "sets"))
+        return (session.get("id"),) + values + (extra,)
+
+    def _set_rows(self, session_id: int, sets: list) -> list:
+        rows = []
+        for position, set_data in enumerate(sets):
+            values, extra = _split_extra(set_data, SET_COLUMNS, ("mixed_strokes",))
+            mixed = set_data.get("mixed_strokes")
+            rows.append(
+                (session_id, position) + values
+                + (json.dumps(list(mixed)) if mixed is not None else None, extra)
+            )
+        return rows
+
+    def _insert_sets(self, session_id: int, sets: list):
+        self.conn.executemany(
+            '''
+            INSERT INTO sets (session_id, position, distance, time, stroke,
+                              repetitions, rest, description, mixed_strokes, extra)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            self._set_rows(session_id, sets)
         )
-        ''')
 
-        self.conn.commit()
+    @staticmethod
+    def _set_from_row(row: tuple) -> dict:
+        set_data = _join_extra(SET_COLUMNS, row[:6], row[7])
+        if row[6] is not None:
+            set_data["mixed_strokes"] = json.loads(row[6])
+        return set_data
+
+    @staticmethod
+    def _session_from_row(row: tuple) -> dict:
+        session = {"id": row[0]}
+        session.update(_join_extra(SESSION_COLUMNS, row[1:7], row[7]))
+        session["sets"] = []
+        return session
+
+    def _attach_sets(self, sessions: dict):
+        """Fill in the sets of ``sessions`` (id -> session) in batches of ids"""
+        ids = list(sessions)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for row in self.conn.execute(
+                "SELECT session_id, distance, time, stroke, repetitions, rest, description, "
+                f"mixed_strokes, extra FROM sets WHERE session_id IN ({','.join('?' * len(chunk))}) "
+                "ORDER BY session_id, position",
+                chunk
+            ):
+                sessions[row[0]]["sets"].append(self._set_from_row(row[1:]))
+
+    def load(self) -> list:
+        sessions = {}
+        for row in self.conn.execute(
+            f"SELECT {SESSION_SELECT} FROM sessions ORDER BY id"
+        ):
+            sessions[row[0]] = self._session_from_row(row)
+
+        for row in self.conn.execute(
+            "SELECT session_id, distance, time, stroke, repetitions, rest, description, "
+            "mixed_strokes, extra FROM sets ORDER BY session_id, position"
+        ):
+            sessions[row[0]]["sets"].append(self._set_from_row(row[1:]))
+
+        return list(sessions.values())
+
+    def get(self, session_id: int):
+        """Load one session through the primary key, or None"""
+        row = self.conn.execute(
+            f"SELECT {SESSION_SELECT} FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        sessions = {row[0]: self._session_from_row(row)}
+        self._attach_sets(sessions)
+        return sessions[row[0]]
+
+    def iter_sessions(self, order: str = "desc", limit=None, cursor=None) -> list:
+        """One page of sessions in (date, id) order using the date index"""
+        direction, compare = ("DESC", "<") if order == "desc" else ("ASC", ">")
+        where, params = "", []
+        if cursor:
+            where = f"WHERE (date, id) {compare} (?, ?)"
+            params = list(cursor)
+        rows = self.conn.execute(
+            f"SELECT {SESSION_SELECT} FROM sessions {where} "
+            f"ORDER BY date {direction}, id {direction} LIMIT ?",
+            params + [-1 if limit is None else limit]
+        ).fetchall()
+        sessions = {row[0]: self._session_from_row(row) for row in rows}
+        self._attach_sets(sessions)
+        return list(sessions.values())
+
+    def sessions_between(self, start: str = None, end: str = None) -> list:
+        """Sessions with ``start <= date < end`` (ISO strings, None for open) by date, through the date index"""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("date < ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT {SESSION_SELECT} FROM sessions {where} ORDER BY date, id", params
+        ).fetchall()
+        sessions = {row[0]: self._session_from_row(row) for row in rows}
+        self._attach_sets(sessions)
+        return list(sessions.values())
+
+    def next_id(self) -> int:
+        """Reserve the next session id from the AUTOINCREMENT sequence"""
+        with self.conn:
+            rows = self.conn.execute(
+                "UPDATE sqlite_sequence SET seq = seq + 1 WHERE name = 'sessions' RETURNING seq"
+            ).fetchall()
+            if rows:
+                return rows[0][0]
+            next_id = (self.conn.execute("SELECT max(id) FROM sessions").fetchone()[0] or 0) + 1
+            self.conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES ('sessions', ?)", (next_id,)
+            )
+            return next_id
+
+    def insert(self, session: dict) -> bool:
+        with self.conn:
+            cursor = self.conn.execute(
+                '''
+                INSERT INTO sessions (id, date, pool_length, total_distance, total_time,
+                                      notes, created_at, extra)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''',
+                self._session_row(session)
+            )
+            self._insert_sets(cursor.lastrowid, session.get("sets", []))
+        return True
+
+    def update(self, session: dict) -> bool:
+        with self.conn:
+            row = self._session_row(session)
+            cursor = self.conn.execute(
+                '''
+                UPDATE sessions SET date = ?, pool_length = ?, total_distance = ?,
+                    total_time = ?, notes = ?, created_at = ?, extra = ?
+                WHERE id = ?
+                ''',
+                row[1:] + row[:1]
+            )
+            if cursor.rowcount == 0:
+                return False
+            self.conn.execute("DELETE FROM sets WHERE session_id = ?", (session["id"],))
+            self._insert_sets(session["id"], session.get("sets", []))
+        return True
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT count(*) FROM sessions").fetchone()[0]
+
+    def bulk_insert(self, sessions, batch_size: int = 1000) -> int:
+        """Insert many sessions in one transaction with batched executemany.
+
+        Sessions whose id is missing or already taken get a fresh one.
+        Returns the number of sessions inserted.
+        """
+        with self.conn:
+            return self._bulk_insert(sessions, batch_size)
+
+    def _bulk_insert(self, sessions, batch_size: int) -> int:
+        taken = {row[0] for row in self.conn.execute("SELECT id FROM sessions")}
+        fresh_ids = (i for i in itertools.count(max(taken, default=0) + 1) if i not in taken)
+        inserted = 0
+        batch = []
+        for session in sessions:
+            batch.append(session)
+            if len(batch) >= batch_size:
+                inserted += self._insert_batch(batch, taken, fresh_ids)
+                batch = []
+        if batch:
+            inserted += self._insert_batch(batch, taken, fresh_ids)
+        return inserted
+
+    def _insert_batch(self, batch: list, taken: set, fresh_ids) -> int:
+        rows = []
+        set_rows = []
+        for session in batch:
+            session_id = session.get("id")
+            if not isinstance(session_id, int) or session_id in taken:
+                session_id = next(fresh_ids)
+            taken.add(session_id)
+            session = dict(session, id=session_id)
+            rows.append(self._session_row(session))
+            set_rows.extend(self._set_rows(session_id, session.get("sets", [])))
+
+        self.conn.executemany(
+            '''
+            INSERT INTO sessions (id, date, pool_length, total_distance, total_time,
+                                  notes, created_at, extra)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            rows
+        )
+        self.conn.executemany(
+            '''
+            INSERT INTO sets (session_id, position, distance, time, stroke,
+                              repetitions, rest, description, mixed_strokes, extra)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            set_rows
+        )
+        return len(rows)
+
+    def import_json(self, json_path: Path, batch_size: int = 1000) -> int:
+        """Import a sessions.json file in either the current or legacy list layout.
+
+        Sessions are streamed from the file, so memory use doesn't grow with
+        its size. The import is recorded in the same transaction, see
+        json_imported().
+        """
+        from src.utils.serializers import iter_sessions
+        with self.conn:
+            inserted = self._bulk_insert(iter_sessions(json_path), batch_size)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                (datetime.now().isoformat(),)
+            )
+        return inserted
+
+    def json_imported(self) -> bool:
+        """Whether a sessions.json history was ever imported into this store"""
+        row = self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone()
+        return row is not None
+
+    def delete(self, session_id: int) -> bool:
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def close(self):
+        self.conn.close()
+
+
+class Database:
+    """Duration/distance/stroke view of the app's session store, used by HistoryFrame.
+
+    Backed by src.utils.database.Database, which picks the storage engine
+    and its files, so the history shows the same sessions as every other
+    window whichever STORAGE_BACKEND is configured.
+    """
+
+    def __init__(self, data_dir="data", storage=None):
+        self.data_dir = Path(data_dir)
+        self.storage = storage
+        # Opened on first use, so creating the app's Database costs nothing at startup
+        self._sessions = None
+
+    @property
+    def sessions(self):
+        if self._sessions is None:
+            from src.utils.database import Database as SessionDatabase
+            self._sessions = SessionDatabase(self.data_dir, self.storage)
+        return self._sessions
+
+    @property
+    def store(self):
+        return self.sessions.store
 
     def add_session(self, duration: int, distance: float, stroke_type: str, notes: str = ""):
         """Add a new swimming session to the database"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        INSERT INTO swimming_sessions (date, duration, distance, stroke_type, notes)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (datetime.now().isoformat(), duration, distance, stroke_type, notes))
-        self.conn.commit()
+        self.sessions.save_session({
+            "date": datetime.now().isoformat(),
+            "sets": [{"distance": distance, "time": duration, "stroke": stroke_type, "repetitions": 1}],
+            "total_distance": distance,
+            "total_time": duration,
+            "notes": notes,
+        })
+
+    @staticmethod
+    def _history_row(session) -> tuple:
+        """(id, date, total time, total distance, comma-separated strokes, notes)"""
+        strokes = dict.fromkeys(s.get("stroke") for s in session.get("sets") or () if s.get("stroke"))
+        return (
+            session.get("id"), session.get("date"), session.get("total_time"),
+            session.get("total_distance"), ",".join(map(str, strokes)) or None, session.get("notes"),
+        )
 
     def get_all_sessions(self):
         """Retrieve all swimming sessions"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM swimming_sessions ORDER BY date DESC')
-        return cursor.fetchall()
-
-    def __del__(self):
-        """Close database connection when object is destroyed"""
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+        return [self._history_row(s) for s in self.sessions.stream_sessions("desc")]
+
+    def get_sessions_page(self, limit: int = 50, before=None):
+        """Retrieve up to ``limit`` sessions, newest first.
+
+        ``before`` is the (date, id) of the last row of the previous page.
+        """
+        page = self.sessions.iter_sessions("desc", limit, tuple(before) if before else None)
+        return [self._history_row(s) for s in page]
+
+    def count_sessions(self) -> int:
+        return self.sessions.count_sessions()
@@ -1,22 +1,260 @@
-from typing import List
+from typing import Callable, List, Optional, Union
 import sqlite3
 
+# A step is either an SQL script or a function that receives the connection
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+
 class Migration:
-    def __init__(self, version: int, up: str, down: str):
+    def __init__(self, version: int, up: Step, down: Step):
         self.version = version
         self.up = up
         self.down = down
 
+
+def _statements(script: str):
+    """Split an SQL script into complete statements"""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip().rstrip(";").strip():
+                yield statement
+            statement = ""
+    if statement.strip():
+        yield statement
+
+
+def _run_step(conn: sqlite3.Connection, step: Step):
+    if callable(step):
+        step(conn)
+        return
+    # executescript() would commit the surrounding transaction, so run
+    # the statements one by one instead
+    for statement in _statements(step):
+        conn.execute(statement)
+
+
+def table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def rebuild_table(conn: sqlite3.Connection, table: str, create_sql: str, select_sql: str):
+    """Replace a table in bulk: create the new layout, copy, then swap.
+
+    ``create_sql`` must create ``{table}_new`` and ``select_sql`` must
+    produce its rows from the old ``table``.  One INSERT ... SELECT is far
+    cheaper than altering or rewriting rows one at a time.
+    """
+    new_table = f"{table}_new"
+    conn.execute(f"DROP TABLE IF EXISTS {new_table}")
+    conn.execute(create_sql)
+    conn.execute(f"INSERT INTO {new_table} {select_sql}")
+    copy_sequence(conn, table, new_table)
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+
+
+def copy_sequence(conn: sqlite3.Connection, source: str, target: str):
+    """Carry ``source``'s AUTOINCREMENT high-water mark over to ``target``.
+
+    Copying rows only moves the target's sequence up to their largest id,
+    so ids that were handed out and deleted since would be reused.
+    """
+    if not table_exists(conn, "sqlite_sequence"):
+        return
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (source,)).fetchone()
+    if row is None:
+        return
+    updated = conn.execute(
+        "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = ?", (row[0], target)
+    ).rowcount
+    if not updated:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (target, row[0]))
+
+
+LEGACY_TABLE = '''
+CREATE TABLE {name} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    distance REAL NOT NULL,
+    stroke_type TEXT NOT NULL,
+    notes TEXT{extra}
+)
+'''
+
+
+def _add_pool_length(conn: sqlite3.Connection):
+    if not table_exists(conn, "swimming_sessions"):
+        return
+    if "pool_length" in table_columns(conn, "swimming_sessions"):
+        return
+    rebuild_table(
+        conn,
+        "swimming_sessions",
+        LEGACY_TABLE.format(name="swimming_sessions_new", extra=",\n    pool_length INTEGER DEFAULT 25"),
+        "SELECT id, date, duration, distance, stroke_type, notes, 25 FROM swimming_sessions"
+    )
+
+
+def _drop_pool_length(conn: sqlite3.Connection):
+    if not table_exists(conn, "swimming_sessions"):
+        return
+    rebuild_table(
+        conn,
+        "swimming_sessions",
+        LEGACY_TABLE.format(name="swimming_sessions_new", extra=""),
+        "SELECT id, date, duration, distance, stroke_type, notes FROM swimming_sessions"
+    )
+
+
+SESSION_TABLES = '''
+CREATE TABLE sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    pool_length INTEGER,
+    total_distance INTEGER,
+    total_time INTEGER,
+    notes TEXT,
+    created_at TEXT,
+    extra TEXT
+);
+
+CREATE TABLE sets (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    distance INTEGER,
+    time INTEGER,
+    stroke TEXT NOT NULL,
+    repetitions INTEGER,
+    rest INTEGER,
+    description TEXT,
+    mixed_strokes TEXT,
+    extra TEXT,
+    PRIMARY KEY (session_id, position)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_sessions_date ON sessions(date);
+CREATE INDEX idx_sets_stroke ON sets(stroke);
+'''
+
+
+def _create_session_tables(conn: sqlite3.Connection):
+    """Move from the one-row-per-session table to sessions plus sets"""
+    _run_step(conn, SESSION_TABLES)
+    if not table_exists(conn, "swimming_sessions"):
+        return
+    conn.execute('''
+        INSERT INTO sessions (id, date, pool_length, total_distance, total_time, notes)
+        SELECT id, date, pool_length, distance, duration, notes FROM swimming_sessions
+    ''')
+    conn.execute('''
+        INSERT INTO sets (session_id, position, distance, time, stroke, repetitions)
+        SELECT id, 0, distance, duration, stroke_type, 1 FROM swimming_sessions
+    ''')
+    copy_sequence(conn, "swimming_sessions", "sessions")
+    conn.execute("DROP TABLE swimming_sessions")
+
+
+def _drop_session_tables(conn: sqlite3.Connection):
+    conn.execute(LEGACY_TABLE.format(
+        name="swimming_sessions", extra=",\n    pool_length INTEGER DEFAULT 25"
+    ))
+    conn.execute('''
+        INSERT INTO swimming_sessions (id, date, duration, distance, stroke_type, notes, pool_length)
+        SELECT s.id, s.date, coalesce(s.total_time, 0), coalesce(s.total_distance, 0),
+               coalesce((SELECT group_concat(DISTINCT stroke) FROM sets WHERE session_id = s.id), ''),
+               s.notes, coalesce(s.pool_length, 25)
+        FROM sessions s
+    ''')
+    copy_sequence(conn, "sessions", "swimming_sessions")
+    conn.execute("DROP TABLE sets")
+    conn.execute("DROP TABLE sessions")
+
+
+def _create_meta_table(conn: sqlite3.Connection):
+    """Key/value facts about the store, such as the one-time JSON import"""
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+    # A store that ever held sessions was created by importing sessions.json,
+    # even if they have all been deleted since
+    if conn.execute("SELECT 1 FROM sqlite_sequence WHERE name = 'sessions'").fetchone():
+        conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', 'before meta table')")
+
+
 class MigrationManager:
+    """Applies schema migrations and records progress in ``PRAGMA user_version``"""
+
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.migrations: List[Migration] = [
-            Migration(
-                version=1,
-                up="""
-                ALTER TABLE swimming_sessions 
-                ADD COLUMN pool_length INTEGER DEFAULT 25
-                """,
-                down="ALTER TABLE swimming_sessions DROP COLUMN pool_length"
-            )
-        ]
\ No newline at end of file
+            Migration(version=1, up=_add_pool_length, down=_drop_pool_length),
+            Migration(version=2, up=_create_session_tables, down=_drop_session_tables),
+            Migration(version=3, up=_create_meta_table, down="DROP TABLE meta"),
+        ]
+
+    @property
+    def latest_version(self) -> int:
+        return max(m.version for m in self.migrations)
+
+    def current_version(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def pending(self, conn: sqlite3.Connection) -> List[Migration]:
+        current = self.current_version(conn)
+        return sorted(
+            (m for m in self.migrations if m.version > current),
+            key=lambda m: m.version
+        )
+
+    def migrate(self, conn: Optional[sqlite3.Connection] = None, target: Optional[int] = None) -> int:
+        """Apply pending ``up`` steps in a single transaction and return the new version"""
+        conn = conn or self._connect()
+        target = self.latest_version if target is None else target
+        steps = [(m.up, m.version) for m in self.pending(conn) if m.version <= target]
+        return self._apply(conn, steps)
+
+    def rollback(self, target: int, conn: Optional[sqlite3.Connection] = None) -> int:
+        """Apply ``down`` steps until the schema is at ``target``"""
+        conn = conn or self._connect()
+        current = self.current_version(conn)
+        steps = [
+            (m.down, m.version - 1)
+            for m in sorted(self.migrations, key=lambda m: m.version, reverse=True)
+            if target < m.version <= current
+        ]
+        return self._apply(conn, steps)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _apply(self, conn: sqlite3.Connection, steps: list) -> int:
+        if not steps:
+            return self.current_version(conn)
+
+        # Table rebuilds drop referenced tables, which must not cascade
+        foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for step, version in steps:
+                    _run_step(conn, step)
+                    conn.execute(f"PRAGMA user_version = {int(version)}")
+                violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+                if violations:
+                    raise sqlite3.IntegrityError(f"Migration left dangling rows: {violations[:5]}")
+            except Exception:
+                conn.rollback()
+                raise
+            conn.commit()
+        finally:
+            conn.execute(f"PRAGMA foreign_keys={'ON' if foreign_keys else 'OFF'}")
+        return self.current_version(conn)
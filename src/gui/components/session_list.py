@@ -0,0 +1,382 @@
+import tkinter as tk
+from bisect import bisect_right
+import customtkinter as ctk
+
+# Card geometry, matching the label heights and paddings used in SessionCard
+CARD_BASE_HEIGHT = 56   # header row plus the sets frame paddings
+SET_LINE_HEIGHT = 32    # one 28px set label with pady=2
+CARD_GAP = 16           # pady=8 above and below every card
+OVERSCAN = 3            # cards rendered beyond each edge of the viewport
+
+
+def card_height(session) -> int:
+    return CARD_BASE_HEIGHT + SET_LINE_HEIGHT * len(session.get('sets', ())) + CARD_GAP
+
+
+class ListLayout:
+    """Vertical offsets of variable-height rows and viewport lookups"""
+
+    def __init__(self, heights=()):
+        self.offsets = [0]
+        for height in heights:
+            self.offsets.append(self.offsets[-1] + height)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def total_height(self) -> int:
+        return self.offsets[-1]
+
+    def insert(self, index: int, height: int):
+        self.offsets.insert(index + 1, self.offsets[index])
+        self._shift(index + 1, height)
+
+    def remove(self, index: int):
+        height = self.offsets[index + 1] - self.offsets[index]
+        del self.offsets[index + 1]
+        self._shift(index + 1, -height)
+
+    def resize(self, index: int, height: int):
+        self._shift(index + 1, height - (self.offsets[index + 1] - self.offsets[index]))
+
+    def _shift(self, start: int, delta: int):
+        # Plain integer updates; no widget work happens here
+        if delta:
+            for i in range(start, len(self.offsets)):
+                self.offsets[i] += delta
+
+    def visible_range(self, top: float, bottom: float, overscan: int = OVERSCAN) -> range:
+        """Indexes of the rows intersecting [top, bottom), widened by ``overscan``"""
+        if not len(self):
+            return range(0)
+        first = max(bisect_right(self.offsets, top) - 1 - overscan, 0)
+        last = min(bisect_right(self.offsets, bottom) + overscan, len(self))
+        return range(first, last)
+
+
+class SessionCard(ctk.CTkFrame):
+    """One session in the list. Cards are recycled, so show() rebinds them"""
+
+    def __init__(self, master, on_edit, on_delete):
+        super().__init__(master, fg_color=("gray95", "gray20"), corner_radius=15)
+        self.session = None
+        self.session_id = None
+        self.tooltip = None
+        self.set_labels = []
+        # Pending delete fade: the after() job and the callback it ends with
+        self._fade_job = None
+        self._fade_done = None
+
+        # Header frame (date and buttons)
+        header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        header_frame.pack(fill="x", padx=15, pady=(10, 0))
+
+        # Left side info frame
+        left_info_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
+        left_info_frame.pack(side="left")
+
+        self.header_label = ctk.CTkLabel(
+            left_info_frame,
+            text="",
+            font=("Helvetica", 14, "bold")
+        )
+        self.header_label.pack(side="left")
+
+        # Notes icon with tooltip, only packed when the session has notes
+        self.notes_label = ctk.CTkLabel(
+            left_info_frame,
+            text="📌",
+            font=("Helvetica", 14),
+            cursor="hand2"
+        )
+        self.notes_label.bind("<Enter>", self.show_tooltip)
+        self.notes_label.bind("<Leave>", self.hide_tooltip)
+
+        # Actions frame
+        actions_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
+        actions_frame.pack(side="right")
+
+        ctk.CTkButton(
+            actions_frame,
+            text="Edit",
+            width=60,
+            height=25,
+            corner_radius=8,
+            command=lambda: on_edit(self.session)
+        ).pack(side="left", padx=2)
+
+        ctk.CTkButton(
+            actions_frame,
+            text="×",
+            width=25,
+            height=25,
+            corner_radius=8,
+            fg_color="red",
+            hover_color="darkred",
+            command=lambda: on_delete(self.session_id)
+        ).pack(side="left", padx=2)
+
+        # Sets summary frame
+        self.sets_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.sets_frame.pack(fill="x", padx=15, pady=(5, 10))
+
+    def show(self, session):
+        """Display ``session``, reusing this card's widgets"""
+        if self._fade_job is not None and session is not self.session:
+            # Rebound mid-fade: stop recolouring, but still finish the delete
+            self.after_cancel(self._fade_job)
+            self._fade_job = None
+            done, self._fade_done = self._fade_done, None
+            self.after_idle(done)
+        self.session = session
+        self.session_id = session.get('id')
+        # A recycled card may still carry the delete fade-out colour
+        self.configure(fg_color=("gray95", "gray20"))
+        self.hide_tooltip()
+
+        # Date and total info
+        date_text = f"📅 {session['date']}"
+        total_distance = f"🏊 {session['total_distance']}m total"
+        total_sets = f"📝 {len(session['sets'])} sets"
+        self.header_label.configure(text=f"{date_text}  |  {total_distance}  |  {total_sets}")
+
+        if session.get('notes'):
+            self.notes_label.pack(side="left", padx=(10, 0))
+        else:
+            self.notes_label.pack_forget()
+
+        # Display set summaries, creating labels only when this card needs more
+        sets = session['sets']
+        while len(self.set_labels) < len(sets):
+            self.set_labels.append(ctk.CTkLabel(
+                self.sets_frame,
+                text="",
+                font=("Helvetica", 12),
+                justify="left",
+                text_color=("gray40", "gray70")
+            ))
+        for i, set_label in enumerate(self.set_labels):
+            if i >= len(sets):
+                set_label.pack_forget()
+                continue
+            set_data = sets[i]
+            set_text = f"Set {i + 1}: {set_data['repetitions']}x{set_data['distance']}m ({set_data['stroke']})"
+            if set_data.get('description'):
+                set_text += f" - {set_data['description']}"
+            set_label.configure(text=set_text)
+            set_label.pack(anchor="w", pady=2)
+
+    def fade_out(self, on_done, alpha=1.0):
+        """Fade the card out over ~200 ms, then call ``on_done``"""
+        self._fade_job = None
+        if alpha > 0:
+            self._fade_done = on_done
+            self.configure(fg_color=(f"gray{int(95*alpha)}", f"gray{int(20*alpha)}"))
+            self._fade_job = self.after(20, lambda: self.fade_out(on_done, alpha - 0.1))
+        else:
+            self._fade_done = None
+            on_done()
+
+    def show_tooltip(self, event):
+        if not self.session or not self.session.get('notes'):
+            return
+        self.hide_tooltip()
+        self.tooltip = ctk.CTkToplevel()
+        self.tooltip.wm_overrideredirect(True)
+        self.tooltip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
+
+        # Add padding and style
+        padding_frame = ctk.CTkFrame(
+            self.tooltip,
+            fg_color=("gray90", "gray20"),
+            corner_radius=8
+        )
+        padding_frame.pack(padx=2, pady=2)
+
+        ctk.CTkLabel(
+            padding_frame,
+            text=self.session['notes'],
+            font=("Helvetica", 12),
+            wraplength=300
+        ).pack(padx=10, pady=5)
+
+    def hide_tooltip(self, event=None):
+        if self.tooltip:
+            self.tooltip.destroy()
+            self.tooltip = None
+
+
+class VirtualSessionList(ctk.CTkFrame):
+    """Scrollable session list that only keeps the visible cards alive.
+
+    Card heights are derived from the number of sets, so the list knows
+    where every card sits without creating it. Scrolling moves a small
+    pool of SessionCards to the rows in view and rebinds them.
+    """
+
+    def __init__(self, master, on_edit, on_delete, on_need_more=None, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        # Called when the viewport reaches the last loaded card
+        self.on_need_more = on_need_more
+        self.sessions = []
+        self.layout = ListLayout()
+        self.cards = {}      # row index -> (card, canvas item)
+        self.spare = []      # hidden (card, canvas item) pairs ready for reuse
+        # Set while a requested page hasn't arrived, so scrolling asks once
+        self.more_pending = False
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, borderwidth=0)
+        self._apply_background()
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+
+        self.canvas.bind("<Configure>", lambda event: self._render())
+        self.bind("<Enter>", self._bind_wheel)
+        self.bind("<Leave>", self._unbind_wheel)
+
+    def _apply_background(self):
+        color = self._apply_appearance_mode(self.master.cget("fg_color"))
+        if color != "transparent":
+            self.canvas.configure(bg=color)
+
+    def set_sessions(self, sessions):
+        """Replace the displayed sessions and jump back to the top"""
+        self.sessions = list(sessions)
+        self.layout = ListLayout(card_height(s) for s in self.sessions)
+        self.more_pending = False
+        for index in list(self.cards):
+            self._release(index)
+        self.canvas.yview_moveto(0)
+        self._render()
+
+    def append_sessions(self, sessions):
+        """Add a page of sessions below the current ones"""
+        self.more_pending = False
+        for session in sessions:
+            self.sessions.append(session)
+            self.layout.insert(len(self.layout), card_height(session))
+        self._render()
+
+    def index_of(self, session_id):
+        for index, session in enumerate(self.sessions):
+            if session.get('id') == session_id:
+                return index
+        return None
+
+    def insert_session(self, session, index=None):
+        """Add one session; only the cards below it move"""
+        index = len(self.sessions) if index is None else index
+        self.sessions.insert(index, session)
+        self.layout.insert(index, card_height(session))
+        self._shift_cards(index, 1)
+        self._render()
+
+    def update_session(self, session):
+        """Rebind the one card showing ``session``, if it is in view"""
+        index = self.index_of(session.get('id'))
+        if index is None:
+            return
+        self.sessions[index] = session
+        self.layout.resize(index, card_height(session))
+        self._render()
+
+    def remove_session(self, session_id):
+        """Drop one session and its card"""
+        index = self.index_of(session_id)
+        if index is None:
+            return
+        if index in self.cards:
+            self._release(index)
+        del self.sessions[index]
+        self.layout.remove(index)
+        self._shift_cards(index + 1, -1)
+        self._render()
+
+    def _shift_cards(self, start, delta):
+        """Re-key rendered cards after rows at or after ``start`` moved by ``delta``"""
+        moved = {i: entry for i, entry in self.cards.items() if i >= start}
+        for i in moved:
+            del self.cards[i]
+        for i, entry in moved.items():
+            self.cards[i + delta] = entry
+
+    def card_for(self, session_id):
+        """Return the rendered card for ``session_id``, if it is on screen"""
+        for card, _ in self.cards.values():
+            if card.session_id == session_id:
+                return card
+        return None
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._render()
+
+    def _bind_wheel(self, event):
+        self.bind_all("<MouseWheel>", self._on_wheel)
+        self.bind_all("<Button-4>", self._on_wheel)
+        self.bind_all("<Button-5>", self._on_wheel)
+
+    def _unbind_wheel(self, event):
+        self.unbind_all("<MouseWheel>")
+        self.unbind_all("<Button-4>")
+        self.unbind_all("<Button-5>")
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.canvas.yview_scroll(-1, "units")
+        else:
+            self.canvas.yview_scroll(1, "units")
+        self._render()
+
+    def _release(self, index):
+        card, item = self.cards.pop(index)
+        self.canvas.itemconfigure(item, state="hidden")
+        card.hide_tooltip()
+        self.spare.append((card, item))
+
+    def _acquire(self):
+        if self.spare:
+            return self.spare.pop()
+        card = SessionCard(self.canvas, self.on_edit, self.on_delete)
+        item = self.canvas.create_window(0, 0, window=card, anchor="nw")
+        return card, item
+
+    def _render(self):
+        """Bind cards to the rows in the viewport and park the rest"""
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(self.canvas.winfo_height(), 1)
+        total = max(self.layout.total_height, height)
+        self.canvas.configure(scrollregion=(0, 0, width, total), yscrollincrement=SET_LINE_HEIGHT)
+
+        top = self.canvas.canvasy(0)
+        wanted = self.layout.visible_range(top, top + height)
+
+        for index in [i for i in self.cards if i not in wanted]:
+            self._release(index)
+
+        for index in wanted:
+            session = self.sessions[index]
+            entry = self.cards.get(index)
+            if entry is None:
+                entry = self.cards[index] = self._acquire()
+                entry[0].show(session)
+            elif entry[0].session is not session:
+                entry[0].show(session)
+            card, item = entry
+            self.canvas.coords(item, 10, self.layout.offsets[index] + CARD_GAP // 2)
+            self.canvas.itemconfigure(
+                item,
+                state="normal",
+                width=max(width - 20, 1),
+                height=card_height(session) - CARD_GAP
+            )
+
+        if self.on_need_more and not self.more_pending and wanted and wanted.stop >= len(self.sessions):
+            # Ask on the next idle turn so a page load never runs mid-render
+            self.more_pending = True
+            self.after_idle(self.on_need_more)
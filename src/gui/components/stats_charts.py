@@ -0,0 +1,86 @@
+from datetime import date
+
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.figure import Figure
+
+from src.models.analytics import lttb, thin_to_grid
+
+# Points drawn per horizontal pixel of the line chart
+POINTS_PER_PIXEL = 1
+# Scatter points closer than this many pixels collapse into one
+SCATTER_CELL_PIXELS = 2
+
+
+class SessionCharts:
+    """Distance-over-time line and time-vs-distance scatter on one reusable figure.
+
+    The axes and artists are created once. update() swaps their data and
+    rescales the axes, so changing the range never rebuilds the figure.
+    Long histories are decimated to the axes' pixel size: LTTB for the
+    line, one point per pixel cell for the scatter.
+    """
+
+    def __init__(self, figsize=(12, 5)):
+        # A plain Figure, not pyplot's, so nothing global needs closing
+        self.figure = Figure(figsize=figsize)
+
+        # Distance over time plot
+        self.distance_axes = self.figure.add_subplot(121)
+        self.distance_line, = self.distance_axes.plot([], [], 'b-o')
+        self.distance_axes.set_title('Distance Over Time')
+        self.distance_axes.set_xlabel('Date')
+        self.distance_axes.set_ylabel('Distance (m)')
+        self.distance_axes.grid(True)
+        self.distance_axes.xaxis_date()
+        self.distance_axes.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        # Applies to tick labels created later too, unlike setp on the current ones
+        self.distance_axes.tick_params(axis='x', labelrotation=45)
+
+        # Time over distance scatter plot
+        self.scatter_axes = self.figure.add_subplot(122)
+        self.time_scatter = self.scatter_axes.scatter([], [])
+        self.scatter_axes.set_title('Time vs Distance')
+        self.scatter_axes.set_xlabel('Distance (m)')
+        self.scatter_axes.set_ylabel('Time (s)')
+        self.scatter_axes.grid(True)
+
+        self.figure.tight_layout()
+        self._data = (np.empty(0), np.empty(0), np.empty(0))
+
+    def _pixel_size(self, axes) -> tuple:
+        extent = axes.get_window_extent()
+        return max(int(extent.width), 1), max(int(extent.height), 1)
+
+    def update(self, dates, distances, times):
+        """Show new data in place; the caller redraws the canvas"""
+        # date2num on date objects is slow; shifting day ordinals is the same number
+        offset = mdates.date2num(date(1970, 1, 1)) - date(1970, 1, 1).toordinal()
+        x = np.fromiter((d.toordinal() for d in dates), dtype=np.float64, count=len(dates)) + offset
+        self._data = (x, np.asarray(distances, dtype=np.float64), np.asarray(times, dtype=np.float64))
+        self.redraw_data()
+
+    def redraw_data(self, event=None):
+        """Decimate the current data for the axes' size; connect to resize_event"""
+        x, distances, times = self._data
+
+        width, _ = self._pixel_size(self.distance_axes)
+        picked = lttb(x, distances, int(width * POINTS_PER_PIXEL))
+        self.distance_line.set_data(x[picked], distances[picked])
+        self._rescale(self.distance_axes, x, distances)
+
+        width, height = self._pixel_size(self.scatter_axes)
+        picked = thin_to_grid(
+            distances, times, width // SCATTER_CELL_PIXELS, height // SCATTER_CELL_PIXELS
+        )
+        self.time_scatter.set_offsets(np.column_stack([distances[picked], times[picked]]))
+        self._rescale(self.scatter_axes, distances, times)
+
+    @staticmethod
+    def _rescale(axes, x, y):
+        """Autoscale to the full data, not just the decimated points"""
+        # relim() also skips collections, so the bounds are fed in by hand
+        axes.relim()
+        if len(x):
+            axes.update_datalim([(x.min(), y.min()), (x.max(), y.max())])
+        axes.autoscale_view()
@@ -1,32 +1,56 @@
 import customtkinter as ctk
 from datetime import datetime
 
+PAGE_SIZE = 50
+
 class HistoryFrame(ctk.CTkFrame):
     def __init__(self, master, db, **kwargs):
         super().__init__(master, **kwargs)
         self.db = db
-        
+        self.rows_shown = 0
+        self.last_row = None
+
         # Create table headers
         headers = ["Date", "Duration (min)", "Distance (m)", "Stroke", "Notes"]
         for i, header in enumerate(headers):
             label = ctk.CTkLabel(self, text=header, font=("Arial", 12, "bold"))
             label.grid(row=0, column=i, padx=5, pady=5, sticky="w")
-        
+
+        # Shown below the last row while older sessions remain
+        self.load_more_btn = ctk.CTkButton(
+            self, text="Load older sessions", command=self.load_more
+        )
+
         self.update_history()
-    
+
     def update_history(self):
         """Update the history view with latest data"""
         # Clear existing items
         for widget in self.grid_slaves():
-            if int(widget.grid_info()["row"]) > 0:
+            if int(widget.grid_info()["row"]) > 0 and widget is not self.load_more_btn:
                 widget.destroy()
-        
-        # Get and display sessions
-        sessions = self.db.get_all_sessions()
-        for i, session in enumerate(sessions, start=1):
-            for j, value in enumerate(session):
+
+        self.rows_shown = 0
+        self.last_row = None
+        self.load_more()
+
+    def load_more(self):
+        """Append the next page of older sessions"""
+        before = (self.last_row[1], self.last_row[0]) if self.last_row else None
+        sessions = self.db.get_sessions_page(PAGE_SIZE, before)
+        for session in sessions:
+            self.rows_shown += 1
+            # Skip the id column, the headers start at the date
+            for j, value in enumerate(session[1:]):
                 text = value
                 if j == 0:  # Format date
                     text = datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M")
                 label = ctk.CTkLabel(self, text=str(text))
-                label.grid(row=i, column=j, padx=5, pady=2, sticky="w")
\ No newline at end of file
+                label.grid(row=self.rows_shown, column=j, padx=5, pady=2, sticky="w")
+
+        if sessions:
+            self.last_row = sessions[-1]
+        if len(sessions) == PAGE_SIZE:
+            self.load_more_btn.grid(row=self.rows_shown + 1, column=0, columnspan=5, pady=5)
+        else:
+            self.load_more_btn.grid_remove()
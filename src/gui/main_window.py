@@ -1,7 +1,16 @@
+import threading
 import customtkinter as ctk
 from datetime import datetime
 from src.gui.session_window import SessionWindow  # Update to absolute import
-from src.utils.database import Database
+from src.gui.components.session_list import VirtualSessionList
+from src.utils.database import Database, session_events, session_key
+
+# Sessions fetched per page while scrolling the history
+PAGE_SIZE = 50
+# Pause after the last keystroke before the search runs
+SEARCH_DELAY_MS = 150
+# Quiet time after startup before matplotlib is imported in the background
+PRELOAD_DELAY_MS = 1500
 
 class MainWindow(ctk.CTk):
     def __init__(self, db):
@@ -21,6 +30,18 @@ class MainWindow(ctk.CTk):
         self.setup_title()
         self.setup_ui()
         self.refresh_sessions_list()
+        
+        # Apply saves, edits and deletes card by card instead of rebuilding
+        self._unsubscribe = session_events.subscribe(self.on_session_changed)
+        
+        # Warm up the charts once the window is up and idle
+        self.after(PRELOAD_DELAY_MS, lambda: self.after_idle(self.preload_statistics))
+
+    def destroy(self):
+        self._unsubscribe()
+        if self._search_job:
+            self.after_cancel(self._search_job)
+        super().destroy()
 
     def setup_title(self):
         """Setup app title and header section"""
@@ -124,7 +145,7 @@ class MainWindow(ctk.CTk):
         )
         title_label.pack(side="left", padx=10)
         
-        # Search frame (for future implementation)
+        # Search frame
         search_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
         search_frame.pack(side="right", padx=10)
         
@@ -134,28 +155,45 @@ class MainWindow(ctk.CTk):
             width=200
         )
         self.search_entry.pack(side="left", padx=5)
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
+        self.search_query = ""
+        self._search_job = None
+
+    def schedule_search(self, event=None):
+        """Run the search once typing pauses, not on every keystroke"""
+        if self._search_job:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY_MS, self.apply_search)
+
+    def apply_search(self):
+        """Filter the list by the search box, or restore it when cleared"""
+        self._search_job = None
+        query = self.search_entry.get().strip()
+        if query != self.search_query:
+            self.search_query = query
+            self.refresh_sessions_list()
 
     def setup_scrollable_sessions(self):
         """Setup enhanced scrollable sessions container"""
-        # Create scrollable frame
-        self.scrollable_frame = ctk.CTkScrollableFrame(
+        # Virtualized list: only the cards in view exist as widgets
+        self.sessions_container = VirtualSessionList(
             self.sessions_frame,
-            label_text="",
-            corner_radius=0
+            on_edit=self.edit_session,
+            on_delete=self.delete_session,
+            on_need_more=self.load_more_sessions
         )
-        self.scrollable_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
-        
-        # Session container
-        self.sessions_container = ctk.CTkFrame(
-            self.scrollable_frame,
-            fg_color="transparent"
-        )
-        self.sessions_container.pack(fill="both", expand=True)
+        self.sessions_container.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.empty_state_frame = None
+        self.has_more_sessions = False
     
     def open_new_session(self):
         session_window = SessionWindow(self)
         self.wait_window(session_window)
-        self.refresh_sessions_list()  # Refresh after window closes
+    
+    def preload_statistics(self):
+        """Import the statistics window and matplotlib on a background thread"""
+        from src.gui.stats_window import preload_charts
+        threading.Thread(target=preload_charts, name="preload-charts", daemon=True).start()
     
     def open_statistics(self):
         from src.gui.stats_window import StatsWindow
@@ -163,186 +201,99 @@ class MainWindow(ctk.CTk):
         self.wait_window(stats_window)
 
     def refresh_sessions_list(self):
-        """Refresh the sessions list with enhanced display"""
-        # Clear existing sessions
-        for widget in self.sessions_container.winfo_children():
-            widget.destroy()
-            
+        """Refresh the sessions list with the newest page of sessions or the search matches"""
         db = Database()
-        sessions = db.get_sessions()
+        if self.search_query:
+            # Answered by the in-memory search index, storage isn't re-read
+            sessions = db.search(self.search_query)
+            self.has_more_sessions = False
+        else:
+            sessions = list(db.iter_sessions(order="desc", limit=PAGE_SIZE))
+            self.has_more_sessions = len(sessions) < db.count_sessions()
         
-        if not sessions:
+        if not sessions and not self.search_query:
+            self.sessions_container.pack_forget()
             self.show_empty_state()
             return
         
-        for session in sessions:
-            # Create session card
-            session_frame = ctk.CTkFrame(
-                self.sessions_container,
-                fg_color=("gray95", "gray20"),
-                corner_radius=15
-            )
-            session_frame.pack(fill="x", pady=8, padx=10)
-            
-            # Header frame (date and buttons)
-            header_frame = ctk.CTkFrame(session_frame, fg_color="transparent")
-            header_frame.pack(fill="x", padx=15, pady=(10, 0))
-            
-            # Left side info frame
-            left_info_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
-            left_info_frame.pack(side="left")
-            
-            # Date and total info
-            date_text = f"📅 {session['date']}"
-            total_distance = f"🏊 {session['total_distance']}m total"
-            total_sets = f"📝 {len(session['sets'])} sets"
-            
-            info_text = f"{date_text}  |  {total_distance}  |  {total_sets}"
-            
-            header_label = ctk.CTkLabel(
-                left_info_frame,
-                text=info_text,
-                font=("Helvetica", 14, "bold")
-            )
-            header_label.pack(side="left")
-            
-            # Notes icon with tooltip (if notes exist)
-            if session.get('notes'):
-                notes_frame = ctk.CTkFrame(left_info_frame, fg_color="transparent")
-                notes_frame.pack(side="left", padx=(10, 0))
-                
-                notes_label = ctk.CTkLabel(
-                    notes_frame,
-                    text="📌",
-                    font=("Helvetica", 14),
-                    cursor="hand2"
-                )
-                notes_label.pack()
-                
-                # Create tooltip functionality
-                def show_tooltip(event, notes_text):
-                    tooltip = ctk.CTkToplevel()
-                    tooltip.wm_overrideredirect(True)
-                    tooltip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
-                    
-                    # Add padding and style
-                    padding_frame = ctk.CTkFrame(
-                        tooltip,
-                        fg_color=("gray90", "gray20"),
-                        corner_radius=8
-                    )
-                    padding_frame.pack(padx=2, pady=2)
-                    
-                    note_label = ctk.CTkLabel(
-                        padding_frame,
-                        text=notes_text,
-                        font=("Helvetica", 12),
-                        wraplength=300
-                    )
-                    note_label.pack(padx=10, pady=5)
-                    
-                    return tooltip
-                
-                def hide_tooltip(event, tooltip):
-                    if tooltip:
-                        tooltip.destroy()
-                
-                tooltip = None
-                
-                def on_enter(event):
-                    nonlocal tooltip
-                    tooltip = show_tooltip(event, session['notes'])
-                
-                def on_leave(event):
-                    nonlocal tooltip
-                    if tooltip:
-                        hide_tooltip(event, tooltip)
-                        tooltip = None
-                
-                notes_label.bind("<Enter>", on_enter)
-                notes_label.bind("<Leave>", on_leave)
-            
-            # Sets summary frame
-            sets_frame = ctk.CTkFrame(session_frame, fg_color="transparent")
-            sets_frame.pack(fill="x", padx=15, pady=(5, 10))
-            
-            # Display set summaries
-            for i, set_data in enumerate(session['sets'], 1):
-                set_text = f"Set {i}: {set_data['repetitions']}x{set_data['distance']}m ({set_data['stroke']})"
-                if set_data.get('description'):
-                    set_text += f" - {set_data['description']}"
-                    
-                set_label = ctk.CTkLabel(
-                    sets_frame,
-                    text=set_text,
-                    font=("Helvetica", 12),
-                    justify="left",
-                    text_color=("gray40", "gray70")
-                )
-                set_label.pack(anchor="w", pady=2)
-            
-            # Actions frame
-            actions_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
-            actions_frame.pack(side="right")
-            
-            # Edit button
-            edit_btn = ctk.CTkButton(
-                actions_frame,
-                text="Edit",
-                width=60,
-                height=25,
-                corner_radius=8,
-                command=lambda s=session: self.edit_session(s)
-            )
-            edit_btn.pack(side="left", padx=2)
-            
-            # Delete button
-            delete_btn = ctk.CTkButton(
-                actions_frame,
-                text="×",
-                width=25,
-                height=25,
-                corner_radius=8,
-                fg_color="red",
-                hover_color="darkred",
-                command=lambda sid=session.get('id'): self.delete_session(sid)
-            )
-            delete_btn.pack(side="left", padx=2)
+        if self.empty_state_frame:
+            self.empty_state_frame.destroy()
+            self.empty_state_frame = None
+        self.sessions_container.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.sessions_container.set_sessions(sessions)
+
+    def load_more_sessions(self):
+        """Append the next page of older sessions once the list is scrolled to its end"""
+        loaded = self.sessions_container.sessions
+        if not self.has_more_sessions or not loaded:
+            return
+        page = list(Database().iter_sessions(
+            order="desc", limit=PAGE_SIZE, cursor=session_key(loaded[-1])
+        ))
+        self.has_more_sessions = len(page) == PAGE_SIZE
+        self.sessions_container.append_sessions(page)
+
+    def _insert_in_order(self, session):
+        """Place a session among the loaded ones, newest first"""
+        key = session_key(session)
+        loaded = self.sessions_container.sessions
+        index = next((i for i, s in enumerate(loaded) if session_key(s) < key), None)
+        if index is None and self.has_more_sessions:
+            # Older than everything loaded, it arrives with a later page
+            return
+        self.sessions_container.insert_session(session, index)
+
+    def on_session_changed(self, event, payload):
+        """Apply one storage change to the sessions list"""
+        if self.search_query:
+            # The change may add or drop matches; re-running the search is cheap
+            self.refresh_sessions_list()
+        elif event == "insert":
+            if self.empty_state_frame:
+                self.refresh_sessions_list()
+            else:
+                self._insert_in_order(payload)
+        elif event == "update":
+            index = self.sessions_container.index_of(payload.get('id'))
+            current = self.sessions_container.sessions[index] if index is not None else None
+            if current is not None and session_key(current) == session_key(payload):
+                self.sessions_container.update_session(payload)
+            else:
+                # The date changed, so the card moves
+                self.sessions_container.remove_session(payload.get('id'))
+                self._insert_in_order(payload)
+        elif event == "delete":
+            self.sessions_container.remove_session(payload)
+            if not self.sessions_container.sessions:
+                self.refresh_sessions_list()
 
     def edit_session(self, session):
         """Open session for editing"""
         edit_window = SessionWindow(self, session=session)
         self.wait_window(edit_window)
-        self.refresh_sessions_list()
 
     def delete_session(self, session_id):
         """Delete a session with visual feedback"""
         from tkinter import messagebox
-        import tkinter as tk
         
-        def fade_out(frame, alpha=1.0):
-            if alpha > 0:
-                # Reduce opacity
-                frame.configure(fg_color=(f"gray{int(95*alpha)}", f"gray{int(20*alpha)}"))
-                self.after(20, lambda: fade_out(frame, alpha - 0.1))
-            else:
-                # Actually delete the session
-                db = Database()
-                if db.delete_session(session_id):
-                    self.refresh_sessions_list()
+        def delete():
+            # The change event removes the card
+            Database().delete_session(session_id)
         
         if messagebox.askyesno("Delete Session", "Are you sure you want to delete this session?"):
-            # Find the session frame
-            for widget in self.sessions_container.winfo_children():
-                if hasattr(widget, 'session_id') and widget.session_id == session_id:
-                    fade_out(widget)
-                    break
+            # The card owns the fade, so rebinding it to another session cancels it
+            card = self.sessions_container.card_for(session_id)
+            if card:
+                card.fade_out(delete)
+            else:
+                delete()
 
     def export_data(self):
         """Export sessions data to CSV file"""
         from tkinter import filedialog
         import csv
         from datetime import datetime
+        from itertools import chain
         
         # Get save file location
         filename = filedialog.asksaveasfilename(
@@ -353,15 +304,13 @@ class MainWindow(ctk.CTk):
         
         if filename:
             try:
-                db = Database()
-                sessions = db.get_sessions()
+                # Newest first, read a page at a time instead of all at once
+                sessions = Database().stream_sessions("desc")
+                first = next(sessions, None)
                 
-                if not sessions:
+                if first is None:
                     return
                 
-                # Sort sessions by date
-                sessions.sort(key=lambda x: x.get("date", ""), reverse=True)
-                
                 # Define CSV headers
                 fieldnames = [
                     "date", "pool_length", "total_distance", 
@@ -372,7 +321,7 @@ class MainWindow(ctk.CTk):
                     writer = csv.DictWriter(file, fieldnames=fieldnames)
                     writer.writeheader()
                     
-                    for session in sessions:
+                    for session in chain((first,), sessions):
                         # Clean up data for CSV export
                         export_data = {
                             "date": session.get("date", ""),
@@ -397,8 +346,10 @@ class MainWindow(ctk.CTk):
 
     def show_empty_state(self):
         """Show enhanced empty state message"""
-        no_sessions_frame = ctk.CTkFrame(
-            self.sessions_container,
+        if self.empty_state_frame:
+            return
+        no_sessions_frame = self.empty_state_frame = ctk.CTkFrame(
+            self.sessions_frame,
             fg_color=("gray95", "gray20"),
             corner_radius=15
         )
@@ -1,7 +1,7 @@
 import customtkinter as ctk
 from datetime import datetime
 from .components.set_dialog import SetDialog
-from src.utils.database import Database
+from src.utils.database import Database, thaw
 
 class SessionWindow(ctk.CTkToplevel):
     def __init__(self, parent, session=None):
@@ -22,8 +22,8 @@ class SessionWindow(ctk.CTkToplevel):
         # Store session data if editing
         self.editing_session = session
         
-        # Initialize variables
-        self.sets = session.get('sets', []) if session else []
+        # Initialize variables (cached sessions are read-only, so edit a copy)
+        self.sets = thaw(session.get('sets', [])) if session else []
         self.parent = parent
         
         self.setup_ui()
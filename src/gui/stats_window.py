@@ -1,10 +1,25 @@
 import customtkinter as ctk
-from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.dates as mdates
+from datetime import date, timedelta
+from src.utils.background import TkWorker
 from src.utils.database import Database
 
+# Days covered by each range_selector option; "all" has no limit
+RANGE_DAYS = {"1w": 7, "1m": 30, "3m": 90, "6m": 180, "1y": 365}
+
+
+def preload_charts():
+    """Import matplotlib and the chart code ahead of the first StatsWindow.
+
+    Safe to run on a background thread: it only imports modules, and the
+    import lock makes a concurrent create_charts() wait for it.
+    """
+    try:
+        import matplotlib.backends.backend_tkagg  # noqa: F401
+        import src.gui.components.stats_charts  # noqa: F401
+    except Exception as e:
+        print(f"Error preloading charts: {e}")
+
+
 class StatsWindow(ctk.CTkToplevel):
     def __init__(self, parent):
         super().__init__(parent)
@@ -12,17 +27,21 @@ class StatsWindow(ctk.CTkToplevel):
         self.geometry("1000x800")
         self.minsize(800, 600)
         
-        # Store reference to figure and canvas
-        self.current_figure = None
+        # One chart figure and canvas, reused for every range
+        self.charts = None
         self.current_canvas = None
+        self.loading_label = None
+        self.stats_shown = False
+        # Sessions are read and summed off the Tk thread
+        self.worker = TkWorker(self)
         
         # Configure grid
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)  # Make charts expandable
         
         self.setup_ui()
-        self.calculate_stats()
-        self.create_charts()
+        self.show_loading()
+        self.load_data(self.range_var.get())
         self.grab_set()
         
         # Bind cleanup to window close
@@ -30,10 +49,14 @@ class StatsWindow(ctk.CTkToplevel):
     
     def on_closing(self):
         """Clean up resources when window is closed"""
-        if self.current_figure:
-            plt.close(self.current_figure)
+        # The figure isn't registered with pyplot, the canvas goes with the window
         self.destroy()
     
+    def destroy(self):
+        # Drop any data still being prepared for this window
+        self.worker.cancel()
+        super().destroy()
+    
     def setup_ui(self):
         # Main container
         self.main_frame = ctk.CTkFrame(self)
@@ -110,143 +133,104 @@ class StatsWindow(ctk.CTkToplevel):
         )
         self.export_btn.grid(row=0, column=1, padx=10, pady=5)
     
+    def show_loading(self):
+        """Placeholder shown in the charts area until the first data arrives"""
+        self.loading_label = ctk.CTkLabel(
+            self.charts_frame,
+            text="Loading statistics...",
+            font=("Helvetica", 16),
+            text_color="gray"
+        )
+        self.loading_label.grid(row=0, column=0, columnspan=2, pady=40)
+    
     def create_charts(self):
-        if self.current_figure:
-            plt.close(self.current_figure)
-        
-        db = Database()
-        sessions = db.get_sessions()
-        
-        if not sessions:
-            return
-        
-        # Sort sessions by date
-        sessions.sort(key=lambda x: datetime.strptime(x.get("date", ""), "%Y-%m-%d"))
-        
-        # Prepare data
-        dates = [datetime.strptime(s.get("date", ""), "%Y-%m-%d") for s in sessions]
-        distances = [s.get("total_distance", 0) for s in sessions]
-        times = [s.get("total_time", 0) for s in sessions]
-        
-        # Create figure with two subplots
-        fig = plt.figure(figsize=(12, 5))
-        
-        # Distance over time plot
-        ax1 = fig.add_subplot(121)
-        ax1.plot(dates, distances, 'b-o')
-        ax1.set_title('Distance Over Time')
-        ax1.set_xlabel('Date')
-        ax1.set_ylabel('Distance (m)')
-        ax1.grid(True)
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
-        
-        # Time over distance scatter plot
-        ax2 = fig.add_subplot(122)
-        ax2.scatter(distances, times)
-        ax2.set_title('Time vs Distance')
-        ax2.set_xlabel('Distance (m)')
-        ax2.set_ylabel('Time (s)')
-        ax2.grid(True)
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Create canvas
-        canvas = FigureCanvasTkAgg(fig, self.charts_frame)
-        canvas.draw()
-        canvas.get_tk_widget().grid(row=0, column=0, columnspan=2, sticky="nsew", padx=10, pady=10)
-        
-        self.current_figure = fig
-        self.current_canvas = canvas
+        """Build the chart figure and canvas once"""
+        # matplotlib is only loaded once a chart is actually shown
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from src.gui.components.stats_charts import SessionCharts
+        
+        self.charts = SessionCharts()
+        self.current_canvas = FigureCanvasTkAgg(self.charts.figure, self.charts_frame)
+        self.current_canvas.get_tk_widget().grid(
+            row=0, column=0, columnspan=2, sticky="nsew", padx=10, pady=10
+        )
+        # The number of points drawn follows the chart's pixel width
+        self.current_canvas.mpl_connect("resize_event", self.charts.redraw_data)
     
     def update_charts(self, time_range=None):
         """Update charts based on selected time range"""
-        # Clear previous charts
-        if self.current_figure:
-            plt.close(self.current_figure)
-        
-        for widget in self.charts_frame.winfo_children():
-            widget.destroy()
-            
-        db = Database()
-        sessions = db.get_sessions()
+        # Supersedes a load still running for the previous range
+        self.load_data(time_range)
+    
+    def load_data(self, time_range=None):
+        """Prepare the stats and chart data on the worker thread"""
+        with_stats = not self.stats_shown
         
-        if not sessions:
+        def work(cancelled):
+            db = Database()
+            stats = ends = None
+            if with_stats:
+                stats, ends = db.get_stats(), self._first_and_latest(db)
+            if cancelled.is_set():
+                return None
+            return stats, ends, self._chart_data(time_range, db)
+        
+        self.worker.submit(work, self.show_data)
+    
+    def show_data(self, result):
+        """Apply data prepared by load_data, on the Tk thread"""
+        if result is None:
             return
-            
-        # Filter sessions based on time range
-        if time_range and time_range != "all":
-            current_date = datetime.now()
-            range_days = {
-                "1w": 7,
-                "1m": 30,
-                "3m": 90,
-                "6m": 180,
-                "1y": 365
-            }.get(time_range)
-            
-            if range_days:
-                sessions = [
-                    s for s in sessions 
-                    if (current_date - datetime.strptime(s.get("date", ""), "%Y-%m-%d")).days <= range_days
-                ]
-        
-        # Sort sessions by date
-        sessions.sort(key=lambda x: datetime.strptime(x.get("date", ""), "%Y-%m-%d"))
+        stats, ends, chart_data = result
+        if stats is not None:
+            self.calculate_stats(stats, ends)
+        
+        if self.loading_label:
+            self.loading_label.destroy()
+            self.loading_label = None
+        if not self.charts:
+            self.create_charts()
+        
+        # Swap the data of the existing artists instead of rebuilding the figure
+        self.charts.update(*chart_data)
+        self.current_canvas.draw_idle()
+    
+    def _chart_data(self, time_range=None, db=None):
+        """Dates, distances and times of the sessions in ``time_range``, oldest first"""
+        # Only the sessions in range are read, with their dates already parsed
+        range_days = RANGE_DAYS.get(time_range)
+        start = date.today() - timedelta(days=range_days) if range_days else None
+        days, sessions = (db or Database()).dated_sessions_between(start)
         
-        # Prepare data
-        dates = [datetime.strptime(s.get("date", ""), "%Y-%m-%d") for s in sessions]
         distances = [s.get("total_distance", 0) for s in sessions]
         times = [s.get("total_time", 0) for s in sessions]
-        
-        # Create figure with two subplots
-        fig = plt.figure(figsize=(12, 5))
-        
-        # Distance over time plot
-        ax1 = fig.add_subplot(121)
-        ax1.plot(dates, distances, 'b-o')
-        ax1.set_title('Distance Over Time')
-        ax1.set_xlabel('Date')
-        ax1.set_ylabel('Distance (m)')
-        ax1.grid(True)
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
-        
-        # Time over distance scatter plot
-        ax2 = fig.add_subplot(122)
-        ax2.scatter(distances, times)
-        ax2.set_title('Time vs Distance')
-        ax2.set_xlabel('Distance (m)')
-        ax2.set_ylabel('Time (s)')
-        ax2.grid(True)
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Create canvas
-        canvas = FigureCanvasTkAgg(fig, self.charts_frame)
-        canvas.draw()
-        canvas.get_tk_widget().grid(row=0, column=0, columnspan=2, sticky="nsew", padx=10, pady=10)
-        
-        self.current_figure = fig
-        self.current_canvas = canvas
+        return list(days), distances, times
+    
+    @staticmethod
+    def _first_and_latest(db) -> tuple:
+        """The oldest and newest session, read from the date-sorted view"""
+        first = next(db.iter_sessions("asc", 1), None)
+        latest = next(db.iter_sessions("desc", 1), None)
+        return first, latest
     
-    def calculate_stats(self):
-        db = Database()
-        sessions = db.get_sessions()
+    def calculate_stats(self, stats=None, ends=None):
+        # Read from the precomputed buckets instead of summing every session
+        if stats is None or ends is None:
+            db = Database()
+            stats = db.get_stats() if stats is None else stats
+            ends = self._first_and_latest(db) if ends is None else ends
+        self.stats_shown = True
+        overall = stats.total()
         
-        if not sessions:
+        if not overall.sessions:
             self._show_no_data()
             return
         
         # Calculate statistics
-        total_sessions = len(sessions)
-        total_distance = sum(session.get("total_distance", 0) for session in sessions)
-        total_time = sum(session.get("total_time", 0) for session in sessions)
-        
-        avg_distance = total_distance / total_sessions if total_sessions > 0 else 0
-        avg_time = total_time / total_sessions if total_sessions > 0 else 0
+        total_sessions = overall.sessions
+        total_distance = overall.distance
+        avg_distance = overall.average_distance
+        avg_time = overall.average_time
         
         # Update labels
         self.total_distance_label.configure(
@@ -262,10 +246,11 @@ class StatsWindow(ctk.CTkToplevel):
             text=f"Average Time per Session: {avg_time:.1f}s"
         )
         
-        # Add progress tracking
-        if len(sessions) >= 2:
-            first_distance = sessions[0].get("total_distance", 0)
-            last_distance = sessions[-1].get("total_distance", 0)
+        # Add progress tracking, comparing the first and latest sessions
+        first, latest = ends
+        if total_sessions >= 2 and first is not None and latest is not None:
+            first_distance = first.get("total_distance", 0)
+            last_distance = latest.get("total_distance", 0)
             progress = ((last_distance - first_distance) / first_distance * 100 
                        if first_distance > 0 else 0)
             
@@ -299,13 +284,14 @@ class StatsWindow(ctk.CTkToplevel):
         
         if filename:
             db = Database()
-            sessions = db.get_sessions()
             
             with open(filename, 'w', newline='') as file:
                 writer = csv.DictWriter(
                     file, 
-                    fieldnames=["date", "pool_length", "total_distance", "total_time"]
+                    fieldnames=["date", "pool_length", "total_distance", "total_time"],
+                    extrasaction="ignore"
                 )
                 writer.writeheader()
-                writer.writerows(sessions)
+                # Written a page at a time rather than loading every session first
+                writer.writerows(db.stream_sessions("asc"))
 
@@ -0,0 +1,203 @@
+import numpy as np
+
+from src.models.stats import parse_day
+
+# Known strokes get fixed codes; anything else is numbered after them
+STROKES = ("freestyle", "backstroke", "breaststroke", "butterfly", "mix")
+PERIOD_UNITS = {"day": "D", "week": "W", "month": "M"}
+
+
+def _day_array(values) -> np.ndarray:
+    """datetime64[D] array of session dates, NaT where a date doesn't parse"""
+    days = [str(value)[:10] if value else "NaT" for value in values]
+    try:
+        return np.array(days, dtype="datetime64[D]")
+    except ValueError:
+        parsed = [parse_day(value) for value in values]
+        return np.array([d if d else "NaT" for d in parsed], dtype="datetime64[D]")
+
+
+def period_start(days: np.ndarray, period: str) -> np.ndarray:
+    """First day of the day/week/month bucket of each date; weeks start on Monday"""
+    if period not in PERIOD_UNITS:
+        raise ValueError(f"period must be one of {tuple(PERIOD_UNITS)}, not {period!r}")
+    if period == "week":
+        # 1970-01-01 was a Thursday, so day number + 3 counts from a Monday
+        return days - (days.astype(np.int64) + 3) % 7
+    return days.astype(f"datetime64[{PERIOD_UNITS[period]}]").astype("datetime64[D]")
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` values; the first window - 1 entries are NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(values.shape, np.nan)
+    if window <= 0 or len(values) < window:
+        return result
+    sums = np.cumsum(np.concatenate(([0.0], values)))
+    result[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return result
+
+
+class SessionColumns:
+    """Sessions and their sets as parallel NumPy arrays, sorted by date.
+
+    Session columns: ``ids``, ``dates`` (datetime64[D]), ``distance`` and
+    ``time``. Set columns: ``set_session`` (row in the session columns),
+    ``set_dates``, ``set_distance``, ``set_time``, ``set_reps``,
+    ``set_rest`` and ``set_stroke`` (codes into ``stroke_names``). Set
+    distance and time are per repetition, as entered.
+    """
+
+    def __init__(self, sessions=()):
+        sessions = list(sessions)
+        dates = _day_array([s.get("date") for s in sessions])
+        order = np.argsort(dates, kind="stable")
+        sessions = [sessions[i] for i in order]
+
+        self.stroke_names = list(STROKES)
+        codes = {name: code for code, name in enumerate(self.stroke_names)}
+        self.ids = np.array([s.get("id") or 0 for s in sessions], dtype=np.int64)
+        self.dates = dates[order]
+        self.distance = np.array([s.get("total_distance") or 0 for s in sessions], dtype=np.float64)
+        self.time = np.array([s.get("total_time") or 0 for s in sessions], dtype=np.float64)
+
+        set_session, distance, time, reps, rest, stroke = [], [], [], [], [], []
+        for row, session in enumerate(sessions):
+            for set_data in session.get("sets") or ():
+                name = set_data.get("stroke") or "unknown"
+                if name not in codes:
+                    codes[name] = len(self.stroke_names)
+                    self.stroke_names.append(name)
+                set_session.append(row)
+                distance.append(set_data.get("distance") or 0)
+                time.append(set_data.get("time") or 0)
+                reps.append(set_data.get("repetitions") or 1)
+                rest.append(set_data.get("rest") or set_data.get("rest_interval") or 0)
+                stroke.append(codes[name])
+
+        self.set_session = np.array(set_session, dtype=np.int64)
+        self.set_dates = self.dates[self.set_session]
+        self.set_distance = np.array(distance, dtype=np.float64)
+        self.set_time = np.array(time, dtype=np.float64)
+        self.set_reps = np.array(reps, dtype=np.int64)
+        self.set_rest = np.array(rest, dtype=np.float64)
+        self.set_stroke = np.array(stroke, dtype=np.int16)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def stroke_code(self, stroke: str) -> int:
+        try:
+            return self.stroke_names.index(stroke)
+        except ValueError:
+            return -1
+
+    def group_by(self, period: str, field: str = "distance", stroke: str = None) -> tuple:
+        """(bucket starts, totals) of ``field`` per day/week/month bucket.
+
+        ``field`` is "distance", "time" or "sessions". With ``stroke`` the
+        totals only cover that stroke's sets (distance and time times the
+        repetitions) and "sessions" counts sessions that swam it.
+        """
+        if stroke is None:
+            valid = ~np.isnat(self.dates)
+            days = self.dates[valid]
+            rows = np.flatnonzero(valid)
+            values = None if field == "sessions" else getattr(self, field)[valid]
+        else:
+            mask = (self.set_stroke == self.stroke_code(stroke)) & ~np.isnat(self.set_dates)
+            days = self.set_dates[mask]
+            rows = self.set_session[mask]
+            if field == "sessions":
+                values = None
+            else:
+                values = getattr(self, f"set_{field}")[mask] * self.set_reps[mask]
+
+        starts = period_start(days, period)
+        buckets, inverse = np.unique(starts, return_inverse=True)
+        if field == "sessions":
+            # Count each session once per bucket, however many sets it has
+            pairs = np.unique(inverse.astype(np.int64) * max(len(self), 1) + rows)
+            totals = np.bincount(pairs // max(len(self), 1), minlength=len(buckets))
+        else:
+            totals = np.bincount(inverse, weights=values, minlength=len(buckets))
+        return buckets, totals
+
+    def stroke_totals(self, field: str = "distance") -> dict:
+        """Total ``field`` ("distance", "time", "reps" or "rest") per stroke name"""
+        values = getattr(self, f"set_{field}")
+        if field in ("distance", "time"):
+            values = values * self.set_reps
+        totals = np.bincount(self.set_stroke, weights=values, minlength=len(self.stroke_names))
+        return {name: totals[code] for code, name in enumerate(self.stroke_names) if totals[code]}
+
+    def daily(self, field: str = "distance") -> tuple:
+        """(every calendar day from first to last session, that day's total ``field``)"""
+        valid = ~np.isnat(self.dates)
+        days = self.dates[valid]
+        if not len(days):
+            return np.array([], dtype="datetime64[D]"), np.array([])
+        first = days[0]
+        offsets = (days - first).astype(np.int64)
+        weights = None if field == "sessions" else getattr(self, field)[valid]
+        totals = np.bincount(offsets, weights=weights, minlength=offsets[-1] + 1)
+        return first + np.arange(len(totals)), totals.astype(np.float64)
+
+    def rolling(self, field: str = "distance", days: int = 7) -> tuple:
+        """(calendar days, trailing ``days``-day mean of the daily ``field`` totals)"""
+        calendar, totals = self.daily(field)
+        return calendar, rolling_mean(totals, days)
+
+    def percentiles(self, field: str = "distance", q=(25, 50, 75)) -> np.ndarray:
+        """Percentiles of the per-session ``field``; pace is seconds per 100m"""
+        if field == "pace":
+            swum = self.distance > 0
+            values = self.time[swum] / (self.distance[swum] / 100)
+        else:
+            values = getattr(self, field)
+        if not len(values):
+            return np.full(len(q), np.nan)
+        return np.percentile(values, q)
+
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """Indexes of ``threshold`` points chosen by largest-triangle-three-buckets.
+
+    Keeps the first and last point and, from each bucket in between, the
+    point forming the largest triangle with the previous pick and the
+    next bucket's mean, so the line keeps its shape with far fewer points.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        mean_x = x[end:next_end].mean()
+        mean_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - mean_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (mean_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        picked[bucket + 1] = previous
+    return picked
+
+
+def thin_to_grid(x, y, columns: int, rows: int) -> np.ndarray:
+    """Indexes keeping one point per cell of a columns x rows grid over the data bounds"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) <= 1 or columns < 1 or rows < 1:
+        return np.arange(len(x))
+    cell_x = ((x - x.min()) / (np.ptp(x) or 1) * (columns - 1)).astype(np.int64)
+    cell_y = ((y - y.min()) / (np.ptp(y) or 1) * (rows - 1)).astype(np.int64)
+    _, keep = np.unique(cell_x * rows + cell_y, return_index=True)
+    return np.sort(keep)
@@ -1 +1,219 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
 
+PERIODS = ("day", "week", "month")
+
+
+def parse_day(value) -> Optional[date]:
+    """The calendar day of a session date string, or None if it has none"""
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def bucket_start(day: date, period: str) -> str:
+    """ISO date of the first day of the day/week/month bucket holding ``day``"""
+    if period == "week":
+        day = day - timedelta(days=day.weekday())
+    elif period == "month":
+        day = day.replace(day=1)
+    return day.isoformat()
+
+
+@dataclass
+class Totals:
+    sessions: int = 0
+    distance: float = 0
+    time: float = 0
+
+    def add(self, other: "Totals", sign: int = 1):
+        self.sessions += sign * other.sessions
+        self.distance += sign * other.distance
+        self.time += sign * other.time
+
+    @property
+    def average_distance(self) -> float:
+        return self.distance / self.sessions if self.sessions else 0
+
+    @property
+    def average_time(self) -> float:
+        return self.time / self.sessions if self.sessions else 0
+
+
+class StatsAggregates:
+    """Session totals bucketed by day, week and month, overall and per stroke.
+
+    Buckets are keyed ``(period, start, stroke)``, where ``period`` is
+    "all" or one of PERIODS, ``start`` the bucket's first day ("" for
+    "all") and ``stroke`` None for every stroke. The overall buckets are
+    summed in one pass when the aggregates are built, the per-stroke
+    ones the first time they are asked for; after that, sessions are
+    added and removed one at a time, so summaries never rescan the history.
+    """
+
+    def __init__(self, sessions=()):
+        self.buckets = {}
+        # id -> session, and id -> the later sessions with that id when a
+        # legacy history repeats it; one list per id would cost a lot of allocations
+        self.sessions = {}
+        self.duplicates = {}
+        # (period, per stroke) views whose buckets are filled in
+        self.views = set()
+        self.signature = None
+        for session in sessions:
+            session_id = session.get("id")
+            if session_id in self.sessions:
+                self.duplicates.setdefault(session_id, []).append(session)
+            else:
+                self.sessions[session_id] = session
+        # What the stats header reads; the rest is summed on first use
+        self._fill([("all", False), ("day", False)])
+
+    @staticmethod
+    def session_parts(session, per_stroke: bool) -> list:
+        """(stroke, sessions, distance, time) of a session: overall (stroke None), or per stroke"""
+        # dict.get skips the read-only wrapping of cached sessions, nothing here is handed out
+        get = dict.get
+        if not per_stroke:
+            return [(None, 1, get(session, "total_distance") or 0, get(session, "total_time") or 0)]
+        strokes = {}
+        for set_data in get(session, "sets") or ():
+            repetitions = get(set_data, "repetitions", 1) or 1
+            # None is the all-strokes key, so unnamed strokes get their own
+            totals = strokes.setdefault(get(set_data, "stroke") or "unknown", [0, 0])
+            totals[0] += (get(set_data, "distance") or 0) * repetitions
+            totals[1] += (get(set_data, "time") or 0) * repetitions
+        return [(stroke, 1, distance, time) for stroke, (distance, time) in strokes.items()]
+
+    @staticmethod
+    def bucket_starts(session) -> dict:
+        """Bucket start of the session's date per period; only "all" if it has no date"""
+        day = parse_day(session.get("date"))
+        starts = {"all": ""}
+        if day is not None:
+            starts.update((period, bucket_start(day, period)) for period in PERIODS)
+        return starts
+
+    def session_contributions(self, session) -> list:
+        """The (bucket key, Totals) pairs one session adds to the filled-in views"""
+        starts = self.bucket_starts(session)
+        contributions = []
+        for per_stroke in (False, True):
+            periods = [p for p, s in self.views if s == per_stroke and p in starts]
+            if periods:
+                contributions.extend(
+                    ((period, starts[period], stroke), Totals(*totals))
+                    for stroke, *totals in self.session_parts(session, per_stroke) for period in periods
+                )
+        return contributions
+
+    def _all_sessions(self):
+        yield from self.sessions.values()
+        for same_id in self.duplicates.values():
+            yield from same_id
+
+    def _fill(self, views: list):
+        """Sum the buckets of ``views`` that aren't filled in yet, in one pass over the sessions"""
+        views = [view for view in views if view not in self.views]
+        if not views:
+            return
+        sums = {}
+        starts_by_date = {}
+        groups = [(per_stroke, [p for p, s in views if s == per_stroke]) for per_stroke in (False, True)]
+        groups = [(per_stroke, periods) for per_stroke, periods in groups if periods]
+        for session in self._all_sessions():
+            date_value = dict.get(session, "date")
+            starts = starts_by_date.get(date_value) if type(date_value) is str else None
+            if starts is None:
+                starts = self.bucket_starts(session)
+                if type(date_value) is str:
+                    starts_by_date[date_value] = starts
+            for per_stroke, periods in groups:
+                for stroke, count, distance, time in self.session_parts(session, per_stroke):
+                    for period in periods:
+                        start = starts.get(period)
+                        if start is None:
+                            continue
+                        key = (period, start, stroke)
+                        bucket = sums.get(key)
+                        if bucket is None:
+                            sums[key] = [count, distance, time]
+                        else:
+                            bucket[0] += count
+                            bucket[1] += distance
+                            bucket[2] += time
+        self.buckets.update((key, Totals(*values)) for key, values in sums.items())
+        self.views.update(views)
+
+    def _apply(self, session, sign: int):
+        for key, totals in self.session_contributions(session):
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = Totals()
+            bucket.add(totals, sign)
+            if bucket.sessions <= 0:
+                del self.buckets[key]
+
+    def add(self, session):
+        """Count a new session, or replace the first one with its id like the stores' update()"""
+        session_id = session.get("id")
+        if session_id in self.sessions:
+            self._apply(self.sessions[session_id], -1)
+        self.sessions[session_id] = session
+        self._apply(session, 1)
+
+    def remove(self, session_id):
+        """Uncount every session with ``session_id``, like the stores' delete()"""
+        if session_id in self.sessions:
+            self._apply(self.sessions.pop(session_id), -1)
+        for session in self.duplicates.pop(session_id, ()):
+            self._apply(session, -1)
+
+    def update(self, session):
+        self.add(session)
+
+    def total(self, stroke=None) -> Totals:
+        """Totals over the whole history"""
+        self._fill([("all", stroke is not None)])
+        bucket = self.buckets.get(("all", "", stroke))
+        return Totals(bucket.sessions, bucket.distance, bucket.time) if bucket else Totals()
+
+    def series(self, period: str, stroke=None, start: str = None, end: str = None) -> list:
+        """(bucket start, Totals) per ``period`` bucket in date order, within [start, end]"""
+        self._fill([(period, stroke is not None)])
+        rows = [
+            (bucket_day, totals) for (kind, bucket_day, bucket_stroke), totals in self.buckets.items()
+            if kind == period and bucket_stroke == stroke
+            and (start is None or bucket_day >= start) and (end is None or bucket_day <= end)
+        ]
+        rows.sort(key=lambda row: row[0])
+        return rows
+
+    def range_total(self, period: str, start: str = None, end: str = None, stroke=None) -> Totals:
+        """Totals of the ``period`` buckets starting within [start, end]"""
+        result = Totals()
+        for _, totals in self.series(period, stroke, start, end):
+            result.add(totals)
+        return result
+
+    def strokes(self) -> list:
+        self._fill([("all", True)])
+        return sorted(
+            stroke for kind, _, stroke in self.buckets
+            if kind == "all" and stroke is not None
+        )
+
+    def copy(self) -> "StatsAggregates":
+        """Snapshot of the buckets that later writes won't touch"""
+        snapshot = StatsAggregates()
+        # Views that aren't filled in yet are summed from the snapshot's own sessions
+        snapshot.sessions = dict(self.sessions)
+        snapshot.duplicates = dict(self.duplicates)
+        snapshot.views = set(self.views)
+        snapshot.buckets = {
+            key: Totals(t.sessions, t.distance, t.time) for key, t in self.buckets.items()
+        }
+        snapshot.signature = self.signature
+        return snapshot
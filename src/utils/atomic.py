@@ -0,0 +1,183 @@
+import atexit
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def fsync_directory(directory: Path):
+    """Make a rename inside ``directory`` durable; not possible (or needed) on Windows"""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def backup_paths(path: Path, generations: int) -> list:
+    """``path.1`` (newest) .. ``path.N`` backup generations of ``path``"""
+    return [path.with_name(f"{path.name}.{i}") for i in range(1, generations + 1)]
+
+
+def rotate_backups(path: Path, generations: int):
+    """Shift the backups of ``path`` down one generation and keep the current file as ``path.1``"""
+    if generations <= 0 or not path.exists():
+        return
+    backups = backup_paths(path, generations)
+    for newer, older in reversed(list(zip(backups, backups[1:]))):
+        if newer.exists():
+            os.replace(newer, older)
+    backups[0].unlink(missing_ok=True)
+    try:
+        # The live file is about to be replaced, not modified, so a hard link is a full copy
+        os.link(path, backups[0])
+    except OSError:
+        shutil.copy2(path, backups[0])
+
+
+@contextmanager
+def atomic_open(path: Path, mode: str = "w", backups: int = 0):
+    """Open a file whose contents replace ``path`` only once the block succeeds.
+
+    Writes go to a temp file next to ``path`` that is fsynced before being
+    renamed over it, and the directory is fsynced after the rename, so a
+    crash leaves either the old or the new file.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, mode, encoding=None if "b" in mode else "utf-8") as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        rotate_backups(path, backups)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    fsync_directory(path.parent)
+
+
+def atomic_write_bytes(path: Path, data: bytes, backups: int = 0):
+    """Replace ``path`` with ``data`` so a crash leaves either the old or the new file"""
+    with atomic_open(path, "wb", backups) as file:
+        file.write(data)
+
+
+def atomic_write_text(path: Path, text: str, backups: int = 0):
+    atomic_write_bytes(path, text.encode("utf-8"), backups)
+
+
+class AtomicWriter:
+    """Crash-safe writer for one file, shared by everything in the process using that path.
+
+    Every write goes through atomic_write_bytes() and keeps ``backups``
+    previous generations. With ``group_commit_ms`` set, write() only
+    stages the value and writes arriving within that window are rendered
+    and committed together, paying for one fsync; ``pending`` holds the
+    staged value so readers in this process still see it.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: Path, render, backups: int = 0, group_commit_ms: int = 0):
+        self.path = Path(path)
+        self.render = render
+        self.backups = backups
+        self.delay = group_commit_ms / 1000
+        # Bumped by every write and every outside change of the file
+        self.version = 0
+        self._lock = threading.RLock()
+        self._pending = None
+        self._timer = None
+        self._known_stat = self._stat()
+
+    @classmethod
+    def open(cls, path: Path, render, backups: int = 0, group_commit_ms: int = 0) -> "AtomicWriter":
+        """Return the shared writer for ``path``, creating it on first use"""
+        key = Path(path).resolve()
+        with cls._instances_lock:
+            writer = cls._instances.get(key)
+            if writer is None:
+                writer = cls._instances[key] = cls(path, render, backups, group_commit_ms)
+            return writer
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def signature(self) -> int:
+        """Changes whenever the file's contents may have, including staged writes"""
+        with self._lock:
+            stat = self._stat()
+            if stat != self._known_stat:
+                # Written by someone else, e.g. another process
+                self._known_stat = stat
+                self.version += 1
+            return self.version
+
+    @property
+    def pending(self):
+        """The staged value not yet on disk, or None"""
+        with self._lock:
+            return self._pending
+
+    def write(self, value):
+        """Write ``render(value)`` now, or within the group commit window"""
+        with self._lock:
+            self._pending = value
+            self.version += 1
+            if not self.delay:
+                try:
+                    self.flush()
+                except BaseException:
+                    self._pending = None
+                    raise
+            elif self._timer is None:
+                self._timer = threading.Timer(self.delay, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Commit the staged value, if any"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            value, self._pending = self._pending, None
+            if value is None:
+                return
+            try:
+                data = self.render(value)
+                if isinstance(data, str):
+                    data = data.encode("utf-8")
+                atomic_write_bytes(self.path, data, self.backups)
+            except BaseException:
+                # Still staged, the next write or flush retries it
+                self._pending = value
+                raise
+            self._known_stat = self._stat()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Error writing {self.path}: {e}")
+
+    @classmethod
+    def flush_all(cls):
+        """Commit every writer's staged value; runs at interpreter exit"""
+        with cls._instances_lock:
+            writers = list(cls._instances.values())
+        for writer in writers:
+            writer._flush_in_background()
+
+
+atexit.register(AtomicWriter.flush_all)
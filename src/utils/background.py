@@ -0,0 +1,91 @@
+import queue
+import threading
+
+
+class TkWorker:
+    """Runs one job at a time on a worker thread and delivers results on the Tk main loop.
+
+    Tk may only be touched from the main thread, so finished jobs go
+    through a queue that ``widget`` drains with after(). Submitting a new
+    job or calling cancel() supersedes the running one: its ``cancelled``
+    event is set so it can stop early, and its result is dropped. Only
+    the latest submitted job waits for the running one to finish; jobs
+    superseded before they started never run.
+    """
+
+    def __init__(self, widget, poll_ms: int = 30):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._results = queue.Queue()
+        self._generation = 0
+        self._cancelled = threading.Event()
+        self._callbacks = None
+        self._poll_job = None
+        # The job waiting to run and the thread running jobs, if any
+        self._lock = threading.Lock()
+        self._next = None
+        self._thread = None
+
+    @property
+    def busy(self) -> bool:
+        return self._poll_job is not None
+
+    def submit(self, work, on_done, on_error=None):
+        """Run ``work(cancelled)`` in the background, then ``on_done(result)`` on the main loop"""
+        self._cancelled.set()
+        self._generation += 1
+        generation = self._generation
+        cancelled = self._cancelled = threading.Event()
+
+        with self._lock:
+            self._next = (generation, work, cancelled)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tk-worker", daemon=True)
+                self._thread.start()
+        self._callbacks = (on_done, on_error)
+        if self._poll_job is None:
+            self._poll_job = self.widget.after(self.poll_ms, self._poll)
+
+    def cancel(self):
+        """Drop the running job's result and stop polling"""
+        self._cancelled.set()
+        self._generation += 1
+        with self._lock:
+            self._next = None
+        if self._poll_job is not None:
+            self.widget.after_cancel(self._poll_job)
+            self._poll_job = None
+
+    def _run(self):
+        """Worker thread: run the latest job until none is waiting"""
+        while True:
+            with self._lock:
+                job, self._next = self._next, None
+                if job is None:
+                    self._thread = None
+                    return
+            generation, work, cancelled = job
+            try:
+                result = (True, work(cancelled))
+            except Exception as e:
+                result = (False, e)
+            self._results.put((generation, result))
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try:
+                generation, (ok, value) = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self._generation:
+                continue  # superseded or cancelled
+            on_done, on_error = self._callbacks
+            if ok:
+                on_done(value)
+            elif on_error:
+                on_error(value)
+            else:
+                print(f"Error in background job: {value}")
+            return
+        self._poll_job = self.widget.after(self.poll_ms, self._poll)
@@ -1 +1,15 @@
+# Storage engine used by src.utils.database.Database: "json", "journal" or "sqlite"
+STORAGE_BACKEND = "json"
 
+# Journal records written before the snapshot is rewritten in the background
+JOURNAL_COMPACT_THRESHOLD = 200
+
+# Previous versions of sessions.json kept as sessions.json.1 (newest) .. .N
+JSON_BACKUP_GENERATIONS = 3
+
+# Milliseconds to gather JSON writes into one fsynced commit; 0 commits every write
+JSON_GROUP_COMMIT_MS = 0
+
+# On-disk format of sessions.json: "json", "json-compact", "msgpack" (needs the
+# msgpack package) or "columnar". Files in any of them are read transparently.
+SESSIONS_FORMAT = "json"
@@ -1,81 +1,712 @@
-import json
 import os
-from datetime import datetime
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
-class Database:
+from src.models.stats import StatsAggregates, parse_day
+from src.utils.atomic import AtomicWriter, backup_paths
+from src.utils import serializers
+from src.utils.config import (
+    JSON_BACKUP_GENERATIONS, JSON_GROUP_COMMIT_MS, SESSIONS_FORMAT, STORAGE_BACKEND
+)
+from src.utils.journal import JournalStore
+from src.utils.search import SearchIndex
+from src.utils.sequence import IdSequence, next_free_id
+
+
+class ReadOnlyDict(dict):
+    """Session mapping handed out by the cache; copy it before editing.
+
+    Only the top level is copied when a session is frozen; nested lists
+    and dicts are wrapped read-only the first time they are read.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("cached sessions are read-only, use thaw() to get an editable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if type(value) in MUTABLE:
+            value = freeze(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        value = dict.get(self, key, default)
+        if type(value) in MUTABLE and key in self:
+            value = freeze(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def _freeze_values(self):
+        for key, value in dict.items(self):
+            if type(value) in MUTABLE:
+                dict.__setitem__(self, key, freeze(value))
+
+    def __iter__(self):
+        # Overriding this also makes dict(session) and {**session} go through __getitem__
+        return dict.__iter__(self)
+
+    def items(self):
+        self._freeze_values()
+        return dict.items(self)
+
+    def values(self):
+        self._freeze_values()
+        return dict.values(self)
+
+    def copy(self):
+        return thaw(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (dict, (thaw(self),))
+
+
+class ReadOnlyList(list):
+    """Sequence handed out by the cache; copy it before editing.
+
+    Like ReadOnlyDict, nested containers are wrapped when first read.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("cached sessions are read-only, use thaw() to get an editable copy")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = list.__getitem__(self, index)
+        if type(value) in MUTABLE:
+            value = freeze(value)
+            list.__setitem__(self, index, value)
+        return value
+
+    def __iter__(self):
+        for index, value in enumerate(list.__iter__(self)):
+            if type(value) in MUTABLE:
+                value = freeze(value)
+                list.__setitem__(self, index, value)
+            yield value
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def __add__(self, other):
+        return list(self) + other
+
+    def copy(self):
+        return thaw(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (list, (thaw(self),))
+
+
+# Plain containers that freeze() still has to wrap
+MUTABLE = (dict, list, tuple)
+
+
+def freeze(value):
+    """A read-only view of parsed JSON; copies one level, nested values are wrapped on access"""
+    if isinstance(value, (ReadOnlyDict, ReadOnlyList)):
+        return value
+    if isinstance(value, dict):
+        return ReadOnlyDict(value)
+    if isinstance(value, (list, tuple)):
+        return ReadOnlyList(value)
+    return value
+
+
+def thaw(value):
+    """Recursively copy read-only containers back into plain dicts and lists"""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in dict.items(value)}
+    if isinstance(value, list):
+        return [thaw(v) for v in list.__iter__(value)]
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def as_day(value):
+    """A date from a date, datetime or ISO string; None stays None"""
+    if value is None or type(value) is date:
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    day = parse_day(value)
+    if day is None:
+        raise ValueError(f"Not a date: {value!r}")
+    return day
+
+
+def session_key(session) -> tuple:
+    """Sort key sessions are paged by: (date, id)"""
+    return (session.get("date") or "", session.get("id") or 0)
+
+
+class CachedSessions:
+    """One store's parsed sessions plus the indexes derived from them"""
+
+    def __init__(self, signature, sessions: list):
+        self.signature = signature
+        self.sessions = tuple(freeze(s) for s in sessions)
+        self._by_id = None
+        self._ordered = None
+        self._keys = None
+        self._dated = None
+        self._columns = None
+
+    @property
+    def by_id(self) -> dict:
+        if self._by_id is None:
+            # Iterate backwards so the first session wins if legacy ids repeat
+            self._by_id = {s.get("id"): s for s in reversed(self.sessions)}
+        return self._by_id
+
+    @property
+    def ordered(self) -> tuple:
+        """Sessions sorted by session_key()"""
+        if self._ordered is None:
+            self._ordered = tuple(sorted(self.sessions, key=session_key))
+            self._keys = [session_key(s) for s in self._ordered]
+        return self._ordered
+
+    @property
+    def dated(self) -> tuple:
+        """(days, sessions): sessions with a valid date in date order and their parsed dates.
+
+        Dates are parsed once per load, and since ``days`` is sorted a
+        date range is two bisects.
+        """
+        if self._dated is None:
+            pairs = [(parse_day(s.get("date")), s) for s in self.ordered]
+            # ISO dates already sort by their string, so this is a linear pass
+            pairs = sorted((pair for pair in pairs if pair[0] is not None), key=lambda pair: pair[0])
+            self._dated = (tuple(day for day, _ in pairs), tuple(s for _, s in pairs))
+        return self._dated
+
+    @property
+    def columns(self):
+        """The sessions as NumPy columns for analytics, built on first use"""
+        if self._columns is None:
+            # Imported here so NumPy only loads once analytics are asked for
+            from src.models.analytics import SessionColumns
+            self._columns = SessionColumns(self.sessions)
+        return self._columns
+
+    def page(self, order: str, limit=None, cursor=None) -> list:
+        """Up to ``limit`` sessions after ``cursor`` in (date, id) order"""
+        ordered = self.ordered
+        keys = self._keys
+        if order == "asc":
+            start = bisect_right(keys, tuple(cursor)) if cursor else 0
+            end = len(keys) if limit is None else start + limit
+            return list(ordered[start:end])
+        end = bisect_left(keys, tuple(cursor)) if cursor else len(keys)
+        start = 0 if limit is None else max(end - limit, 0)
+        return list(reversed(ordered[start:end]))
+
+
+class SessionCache:
+    """Process-wide parsed sessions, keyed by store and validated by signature"""
+
     def __init__(self):
-        self.data_dir = Path("data")
-        self.sessions_file = self.data_dir / "sessions.json"
-        self._ensure_data_dir()
-    
-    def _ensure_data_dir(self):
-        """Ensure data directory and files exist"""
-        self.data_dir.mkdir(exist_ok=True)
-        if not self.sessions_file.exists():
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, signature):
+        """Return the cached entry, or None if missing or the signature changed"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.signature != signature:
+            return None
+        return entry
+
+    def put(self, key, signature, sessions: list) -> CachedSessions:
+        entry = CachedSessions(signature, sessions)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self, key=None):
+        """Drop one store's entry, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+session_cache = SessionCache()
+
+
+class SessionEvents:
+    """Process-wide notifications about sessions written through Database.
+
+    Listeners are called as ``callback(event, payload)`` on the writing
+    thread, where ``event`` is "insert" or "update" with the read-only
+    session as payload, or "delete" with the session id.
+    """
+
+    def __init__(self):
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """Register ``callback`` and return a function that removes it again"""
+        with self._lock:
+            self._listeners.append(callback)
+        return lambda: self.unsubscribe(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def emit(self, event: str, payload):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event, payload)
+            except Exception as e:
+                print(f"Error in session listener: {e}")
+
+
+session_events = SessionEvents()
+
+# Process-wide indexes derived from a store's sessions (search, stats), by
+# (kind, store cache key). Database writes patch them in place with
+# add(session)/remove(id); one whose signature no longer matches the store
+# is rebuilt on next use.
+derived_indexes = {}
+derived_indexes_lock = threading.RLock()
+
+
+def _parse_sessions(data: bytes) -> list:
+    data = serializers.loads(data)
+    if isinstance(data, list):
+        # Handle legacy data format
+        return data
+    return data.get("sessions", [])
+
+
+def _render_sessions(sessions: list) -> bytes:
+    return serializers.dumps({"sessions": sessions}, SESSIONS_FORMAT)
+
+
+class JsonStore:
+    """Whole-file store: every change atomically rewrites sessions.json"""
+
+    def __init__(self, sessions_file: Path):
+        self.sessions_file = sessions_file
+        self.writer = AtomicWriter.open(
+            sessions_file, _render_sessions, JSON_BACKUP_GENERATIONS, JSON_GROUP_COMMIT_MS
+        )
+        # (writer version, sessions) of this store's last write, so reading
+        # back our own change doesn't parse the file again
+        self._written = None
+        if not self.sessions_file.exists() and self.writer.pending is None:
             self._write_empty_db()
-    
+        self.ids = IdSequence(
+            sessions_file.with_suffix(".seq"), seed=lambda: next_free_id(self.load()),
+            signature=self.signature
+        )
+
+    @property
+    def cache_key(self):
+        return self.sessions_file.resolve()
+
+    def signature(self):
+        """Write counter of sessions.json, also bumped when it changes on disk"""
+        return self.writer.signature()
+
     def _write_empty_db(self):
         """Initialize empty database structure"""
-        self.sessions_file.write_text(json.dumps({"sessions": []}, indent=2))
-    
+        self.writer.write([])
+        self.writer.flush()
+
+    def _write(self, sessions: list):
+        # Stored in (date, id) order so loads come back presorted
+        sessions.sort(key=session_key)
+        self.writer.write(sessions)
+        self._written = (self.writer.version, sessions)
+        self.ids.sync()
+
+    def load(self) -> list:
+        # A group commit that hasn't reached the disk yet is the newest state
+        pending = self.writer.pending
+        if pending is not None:
+            return list(pending)
+        written = self._written
+        if written is not None and written[0] == self.writer.signature():
+            return list(written[1])
+        try:
+            if not self.sessions_file.exists():
+                self._write_empty_db()
+                return []
+            return _parse_sessions(self.sessions_file.read_bytes())
+        except Exception as e:
+            print(f"Error loading sessions: {e}")
+            return self._recover()
+
+    def _recover(self) -> list:
+        """Set the unreadable file aside and fall back to the newest readable backup"""
+        if self.sessions_file.exists():
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            corrupt = self.sessions_file.with_name(f"{self.sessions_file.name}.corrupt-{stamp}")
+            os.replace(self.sessions_file, corrupt)
+        for backup in backup_paths(self.sessions_file, JSON_BACKUP_GENERATIONS):
+            try:
+                sessions = _parse_sessions(backup.read_bytes())
+            except Exception:
+                continue
+            print(f"Restored sessions from {backup.name}")
+            self.writer.write(sessions)
+            self.writer.flush()
+            return sessions
+        # Create new empty database
+        self._write_empty_db()
+        return []
+
+    def next_id(self) -> int:
+        return self.ids.next_id()
+
+    def insert(self, session: dict) -> bool:
+        sessions = self.load()
+        sessions.append(session)
+        self._write(sessions)
+        return True
+
+    def update(self, session: dict) -> bool:
+        sessions = self.load()
+        for i, existing in enumerate(sessions):
+            if existing.get('id') == session['id']:
+                sessions[i] = session
+                self._write(sessions)
+                return True
+        return False
+
+    def delete(self, session_id: int) -> bool:
+        sessions = self.load()
+        original_length = len(sessions)
+        sessions = [s for s in sessions if s.get('id') != session_id]
+
+        # Only write if we actually removed a session
+        if len(sessions) < original_length:
+            self._write(sessions)
+            return True
+        return False
+
+
+class Database:
+    def __init__(self, data_dir="data", storage=None):
+        self.data_dir = Path(data_dir)
+        self.sessions_file = self.data_dir / "sessions.json"
+        self.storage = storage or STORAGE_BACKEND
+        self._ensure_data_dir()
+        self.store = self._open_store()
+
+    def _ensure_data_dir(self):
+        """Ensure data directory exists"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+    def _open_store(self):
+        """Create the storage engine selected by ``storage``"""
+        if self.storage == "json":
+            return JsonStore(self.sessions_file)
+        if self.storage == "journal":
+            return JournalStore.open(self.sessions_file)
+        if self.storage == "sqlite":
+            # Imported on demand so the JSON backends start without sqlite3
+            from src.data.database import SqliteStore
+            store = SqliteStore(self.data_dir / "swimming.db")
+            # First switch to SQLite: bring the JSON history along, once; an
+            # empty table may just mean every session was deleted since
+            if self.sessions_file.exists() and not store.json_imported():
+                store.import_json(self.sessions_file)
+            return store
+        raise ValueError(f"Unknown storage backend: {self.storage}")
+
+    def _write(self, event: str, operation, payload) -> bool:
+        """Run a store mutation, drop the stale cache entry and announce the change"""
+        key = self.store.cache_key
+        before = self.store.signature()
+        try:
+            changed = operation(payload)
+        finally:
+            session_cache.invalidate(key)
+        if changed:
+            payload = payload if event == "delete" else freeze(payload)
+            self._update_derived(key, before, event, payload)
+            session_events.emit(event, payload)
+        return changed
+
+    def _update_derived(self, key, before, event: str, payload):
+        """Apply one write to the store's derived indexes instead of rebuilding them"""
+        with derived_indexes_lock:
+            after = self.store.signature()
+            for index_key in [k for k in derived_indexes if k[1] == key]:
+                index = derived_indexes[index_key]
+                if index.signature != before:
+                    # Someone else changed the store too; rebuild on next use
+                    del derived_indexes[index_key]
+                    continue
+                if event == "delete":
+                    index.remove(payload)
+                else:
+                    index.add(payload)
+                index.signature = after
+
+    def _derived(self, kind: str, build):
+        """The store's ``kind`` index, built from the cached sessions when missing or stale.
+
+        Call with derived_indexes_lock held and don't let the index escape it.
+        """
+        key = (kind, self.store.cache_key)
+        index = derived_indexes.get(key)
+        if index is None or index.signature != self.store.signature():
+            entry = self._cached()
+            index = build(entry.sessions)
+            index.signature = entry.signature
+            derived_indexes[key] = index
+        return index
+
     def save_session(self, session_data: dict) -> bool:
         """Save a new session to the database"""
         try:
-            # Read existing sessions
-            sessions = self.get_sessions()
-            
             # Add unique ID and timestamp
-            session_data["id"] = len(sessions) + 1
+            session_data["id"] = self.store.next_id()
             session_data["created_at"] = datetime.now().isoformat()
-            
-            # Add new session
-            sessions.append(session_data)
-            
-            # Save updated data
-            self.sessions_file.write_text(
-                json.dumps({"sessions": sessions}, indent=2, default=str)
-            )
-            return True
-            
+
+            return self._write("insert", self.store.insert, thaw(session_data))
+
         except Exception as e:
             print(f"Error saving session: {e}")
             return False
-    
+
+    def _cached(self) -> CachedSessions:
+        key = self.store.cache_key
+        signature = self.store.signature()
+        entry = session_cache.get(key, signature)
+        if entry is None:
+            entry = session_cache.put(key, signature, self.store.load())
+        return entry
+
     def get_sessions(self) -> list:
-        """Get all sessions from the database"""
+        """Get all sessions from the database as read-only mappings.
+
+        The parsed sessions are shared process-wide and only re-read when
+        the store changes, so use thaw() on anything you want to edit.
+        """
         try:
-            if not self.sessions_file.exists():
-                self._write_empty_db()
-                return []
-            
-            data = json.loads(self.sessions_file.read_text())
-            if isinstance(data, list):
-                # Handle legacy data format
-                return data
-            return data.get("sessions", [])
+            return list(self._cached().sessions)
         except Exception as e:
             print(f"Error loading sessions: {e}")
-            # Backup corrupted file
-            if self.sessions_file.exists():
-                backup_path = self.sessions_file.with_suffix('.json.bak')
-                self.sessions_file.rename(backup_path)
-            # Create new empty database
-            self._write_empty_db()
             return []
 
+    def get_session(self, session_id: int):
+        """Get one session by ID as a read-only mapping, or None"""
+        try:
+            entry = session_cache.get(self.store.cache_key, self.store.signature())
+            if entry is None and hasattr(self.store, "get"):
+                # Indexed stores answer directly, no need to load everything
+                session = self.store.get(session_id)
+                return freeze(session) if session is not None else None
+            return (entry or self._cached()).by_id.get(session_id)
+        except Exception as e:
+            print(f"Error loading session: {e}")
+            return None
+
+    def iter_sessions(self, order: str = "desc", limit=None, cursor=None):
+        """Iterate sessions by date (then id), newest first by default.
+
+        Returns at most ``limit`` sessions. To fetch the next page pass
+        ``session_key()`` of the last session received as ``cursor``.
+        """
+        if order not in ("asc", "desc"):
+            raise ValueError(f"order must be 'asc' or 'desc', not {order!r}")
+        try:
+            if hasattr(self.store, "iter_sessions"):
+                sessions = self.store.iter_sessions(order, limit, cursor)
+                return iter([freeze(s) for s in sessions])
+            return iter(self._cached().page(order, limit, cursor))
+        except Exception as e:
+            print(f"Error loading sessions: {e}")
+            return iter([])
+
+    def stream_sessions(self, order: str = "desc", page_size: int = 500):
+        """Yield every session in date order a page at a time, e.g. for exports.
+
+        Stores that page themselves (SQLite) only ever hold one page in memory.
+        """
+        cursor = None
+        while True:
+            page = list(self.iter_sessions(order, page_size, cursor))
+            yield from page
+            if len(page) < page_size:
+                return
+            cursor = session_key(page[-1])
+
+    def _files_stamp(self) -> list:
+        """Name, mtime and size of each file the store keeps its sessions in"""
+        if isinstance(self.store, JsonStore):
+            # Group-committed writes have to be on disk for the stamp to cover them
+            self.store.writer.flush()
+        if self.storage == "sqlite":
+            names = ["swimming.db", "swimming.db-wal"]
+        elif self.storage == "journal":
+            names = ["sessions.json", "sessions.journal"]
+        else:
+            names = ["sessions.json"]
+        stamp = []
+        for name in names:
+            try:
+                stat = (self.data_dir / name).stat()
+                stamp.append([name, stat.st_mtime_ns, stat.st_size])
+            except FileNotFoundError:
+                stamp.append([name, None, None])
+        return stamp
+
+    def _mapped_files(self) -> list:
+        """(version, path) of every sessions.<version>.map snapshot, oldest first"""
+        files = []
+        for path in self.data_dir.glob("sessions.*.map"):
+            version = path.name[len("sessions."):-len(".map")]
+            if version.isdigit():
+                files.append((int(version), path))
+        return sorted(files)
+
+    def mapped_sessions(self):
+        """A read-only, memory-mapped snapshot of the sessions, or None on error.
+
+        The snapshot is in session_key() order, date then id ascending,
+        which MappedSessions.page() relies on. It is only rebuilt when the
+        store's files have changed since it was written. Worker processes
+        can open the same file instead of getting a copy.
+
+        Each rebuild writes a new sessions.<version>.map rather than
+        replacing the file in place, since Windows can't replace or delete
+        a file another snapshot still has mapped. Older versions are
+        removed once nothing maps them.
+        """
+        # Imported here like the other optional views of the data
+        from src.utils.mapped import MappedSessions, write_mapped
+        try:
+            stamp = self._files_stamp()
+            files = self._mapped_files()
+            if files:
+                try:
+                    mapped = MappedSessions(files[-1][1])
+                    if mapped.source == stamp:
+                        return mapped
+                    mapped.close()
+                except (FileNotFoundError, ValueError):
+                    pass
+            version = files[-1][0] + 1 if files else 1
+            path = self.data_dir / f"sessions.{version}.map"
+            write_mapped(path, self._cached().ordered, source=stamp)
+            for _, old in files:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass  # still mapped on Windows, removed by a later rebuild
+            return MappedSessions(path)
+        except Exception as e:
+            print(f"Error building session snapshot: {e}")
+            return None
+
+    def search(self, query: str, limit=None) -> list:
+        """Sessions whose date, notes, strokes or set descriptions match ``query``.
+
+        Every word of the query must prefix a word of the session. Results
+        are read-only and newest first.
+        """
+        try:
+            with derived_indexes_lock:
+                index = self._derived(
+                    "search", lambda sessions: SearchIndex(sessions, sort_key=session_key)
+                )
+                return index.search(query, limit)
+        except Exception as e:
+            print(f"Error searching sessions: {e}")
+            return []
+
+    def get_stats(self) -> StatsAggregates:
+        """Day/week/month and per-stroke session totals.
+
+        The aggregates are kept up to date on every write, so this costs
+        one copy of the buckets rather than a pass over the history.
+        """
+        try:
+            with derived_indexes_lock:
+                return self._derived("stats", StatsAggregates).copy()
+        except Exception as e:
+            print(f"Error loading stats: {e}")
+            return StatsAggregates()
+
+    def dated_sessions_between(self, start=None, end=None) -> tuple:
+        """(parsed dates, sessions) dated within [start, end], oldest first.
+
+        ``start`` and ``end`` are dates or ISO date strings, None leaves that
+        side open. Only the sessions in range are touched: the cached date
+        order is bisected, or a cold indexed store is queried directly.
+        """
+        start, end = as_day(start), as_day(end)
+        try:
+            entry = session_cache.get(self.store.cache_key, self.store.signature())
+            if entry is None and hasattr(self.store, "sessions_between") and (start or end):
+                sessions = self.store.sessions_between(
+                    start.isoformat() if start else None,
+                    (end + timedelta(days=1)).isoformat() if end else None
+                )
+                pairs = [(parse_day(s.get("date")), freeze(s)) for s in sessions]
+                pairs = [pair for pair in pairs if pair[0] is not None]
+                return tuple(day for day, _ in pairs), tuple(s for _, s in pairs)
+
+            days, sessions = (entry or self._cached()).dated
+            first = bisect_left(days, start) if start else 0
+            last = bisect_right(days, end) if end else len(days)
+            return days[first:last], sessions[first:last]
+        except Exception as e:
+            print(f"Error loading sessions: {e}")
+            return (), ()
+
+    def sessions_between(self, start=None, end=None) -> list:
+        """Read-only sessions dated within [start, end], oldest first"""
+        return list(self.dated_sessions_between(start, end)[1])
+
+    def get_columns(self):
+        """All sessions and sets as a shared, read-only SessionColumns"""
+        return self._cached().columns
+
+    def count_sessions(self) -> int:
+        """Number of stored sessions"""
+        try:
+            if hasattr(self.store, "count"):
+                return self.store.count()
+            return len(self._cached().sessions)
+        except Exception as e:
+            print(f"Error counting sessions: {e}")
+            return 0
+
     def delete_session(self, session_id: int) -> bool:
         """Delete a session by ID"""
         try:
-            sessions = self.get_sessions()
-            original_length = len(sessions)
-            sessions = [s for s in sessions if s.get('id') != session_id]
-            
-            # Only write if we actually removed a session
-            if len(sessions) < original_length:
-                self.sessions_file.write_text(json.dumps({"sessions": sessions}, indent=2, default=str))
-                return True
-            return False
+            return self._write("delete", self.store.delete, session_id)
         except Exception as e:
             print(f"Error deleting session: {e}")
             return False
@@ -83,15 +714,7 @@ class Database:
     def update_session(self, session_data: dict) -> bool:
         """Update an existing session"""
         try:
-            sessions = self.get_sessions()
-            for i, session in enumerate(sessions):
-                if session.get('id') == session_data['id']:
-                    sessions[i] = session_data
-                    self.sessions_file.write_text(
-                        json.dumps({"sessions": sessions}, indent=2, default=str)
-                    )
-                    return True
-            return False
+            return self._write("update", self.store.update, thaw(session_data))
         except Exception as e:
             print(f"Error updating session: {e}")
             return False
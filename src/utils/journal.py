@@ -0,0 +1,200 @@
+import json
+import threading
+from pathlib import Path
+
+from src.utils import serializers
+from src.utils.atomic import atomic_write_bytes, atomic_write_text
+from src.utils.config import JOURNAL_COMPACT_THRESHOLD, JSON_BACKUP_GENERATIONS, SESSIONS_FORMAT
+from src.utils.sequence import IdSequence, next_free_id
+
+
+class JournalStore:
+    """Append-only session store.
+
+    Every mutation is appended as one JSON line to ``sessions.journal``.
+    ``sessions.json`` is used as the snapshot and carries the sequence
+    number of the last journal record it contains, so startup loads the
+    snapshot and replays only newer records.  Once enough records have
+    piled up the snapshot is rewritten on a background thread.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, snapshot_file: Path, compact_threshold: int = JOURNAL_COMPACT_THRESHOLD):
+        self.snapshot_file = Path(snapshot_file)
+        self.journal_file = self.snapshot_file.with_suffix(".journal")
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._compactor = None
+        self._seq = 0
+        self._snapshot_seq = 0
+        # Deleted sessions leave a None behind until the next compaction, so
+        # _index (id -> list positions) stays valid and edits are O(1)
+        self._sessions = []
+        self._index = {}
+        self._replay()
+        self._journal = open(self.journal_file, "a", encoding="utf-8")
+        self.ids = IdSequence(
+            self.snapshot_file.with_suffix(".seq"), seed=lambda: next_free_id(self.load()),
+            signature=self.signature
+        )
+
+    @classmethod
+    def open(cls, snapshot_file: Path) -> "JournalStore":
+        """Return the shared store for a snapshot file, replaying it once per process"""
+        key = Path(snapshot_file).resolve()
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls._instances[key] = cls(snapshot_file)
+            return store
+
+    def _replay(self):
+        """Load the snapshot and apply journal records newer than it"""
+        if self.snapshot_file.exists():
+            # Streamed, so the raw file and the sessions aren't both in memory;
+            # a legacy bare list has no "seq" and counts as 0
+            meta = {}
+            self._reset(serializers.iter_sessions(self.snapshot_file, meta))
+            self._snapshot_seq = self._seq = meta.get("seq", 0)
+
+        if not self.journal_file.exists():
+            return
+
+        with open(self.journal_file, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write from a crash, everything before it is intact
+                    break
+                if record["seq"] <= self._seq:
+                    continue
+                self._apply(record)
+                self._seq = record["seq"]
+
+    def _reset(self, sessions: list):
+        self._sessions = list(sessions)
+        self._index = {}
+        for position, session in enumerate(self._sessions):
+            self._index.setdefault(session.get("id"), []).append(position)
+
+    def _apply(self, record: dict) -> bool:
+        op = record["op"]
+        if op == "insert":
+            session = record["session"]
+            self._index.setdefault(session.get("id"), []).append(len(self._sessions))
+            self._sessions.append(session)
+            return True
+        if op == "update":
+            session = record["session"]
+            positions = self._index.get(session["id"])
+            if not positions:
+                return False
+            self._sessions[positions[0]] = session
+            return True
+        if op == "delete":
+            positions = self._index.pop(record["id"], None)
+            if not positions:
+                return False
+            for position in positions:
+                self._sessions[position] = None
+            return True
+        raise ValueError(f"Unknown journal operation: {op}")
+
+    def _append(self, record: dict) -> bool:
+        with self._lock:
+            record["seq"] = self._seq + 1
+            if not self._apply(record):
+                return False
+            self._journal.write(json.dumps(record, default=str) + "\n")
+            self._journal.flush()
+            self._seq = record["seq"]
+            self.ids.sync()
+            if self._seq - self._snapshot_seq >= self.compact_threshold:
+                self._start_compaction()
+            return True
+
+    @property
+    def cache_key(self):
+        return self.snapshot_file.resolve()
+
+    def signature(self):
+        """The journal holds the live state, so its sequence number is enough"""
+        return self._seq
+
+    def load(self) -> list:
+        with self._lock:
+            return [s for s in self._sessions if s is not None]
+
+    def get(self, session_id: int):
+        """Return the session with ``session_id`` or None"""
+        with self._lock:
+            positions = self._index.get(session_id)
+            return self._sessions[positions[0]] if positions else None
+
+    def next_id(self) -> int:
+        return self.ids.next_id()
+
+    def insert(self, session: dict) -> bool:
+        return self._append({"op": "insert", "session": session})
+
+    def update(self, session: dict) -> bool:
+        return self._append({"op": "update", "session": session})
+
+    def delete(self, session_id: int) -> bool:
+        return self._append({"op": "delete", "id": session_id})
+
+    def _start_compaction(self):
+        if self._compactor and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(
+            target=self.compact, name="journal-compactor", daemon=True
+        )
+        self._compactor.start()
+
+    def compact(self):
+        """Rewrite the snapshot and drop the journal records it now contains"""
+        with self._lock:
+            seq = self._seq
+            if seq == self._snapshot_seq:
+                return
+            sessions = self.load()
+            # Keep the snapshot in (date, id) order, like JsonStore, so loading
+            # it hands the cache presorted data
+            sessions.sort(key=lambda s: (s.get("date") or "", s.get("id") or 0))
+            # Drop the tombstones while we have a dense copy anyway
+            self._reset(sessions)
+
+        # Serializing the snapshot is the slow part, so it runs unlocked
+        atomic_write_bytes(
+            self.snapshot_file,
+            serializers.dumps({"seq": seq, "sessions": sessions}, SESSIONS_FORMAT),
+            JSON_BACKUP_GENERATIONS
+        )
+
+        with self._lock:
+            self._snapshot_seq = seq
+            self._journal.close()
+            with open(self.journal_file, encoding="utf-8") as journal:
+                pending = [line for line in journal if self._newer_than(line, seq)]
+            atomic_write_text(self.journal_file, "".join(pending))
+            self._journal = open(self.journal_file, "a", encoding="utf-8")
+
+    @staticmethod
+    def _newer_than(line: str, seq: int) -> bool:
+        try:
+            return json.loads(line)["seq"] > seq
+        except json.JSONDecodeError:
+            return False
+
+    def close(self):
+        """Wait for a running compaction and fold the journal into the snapshot"""
+        if self._compactor:
+            self._compactor.join()
+        self.compact()
+        with self._lock:
+            self._journal.close()
+        with JournalStore._instances_lock:
+            JournalStore._instances.pop(self.snapshot_file.resolve(), None)
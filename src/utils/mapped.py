@@ -0,0 +1,319 @@
+"""Read-only, memory-mapped session snapshots.
+
+A snapshot is one file: a header, a fixed-width record per session and
+per set, an id index and a heap of UTF-8 strings. Opening it maps the
+file and reads the header, whatever its size; a session is decoded only
+when it is asked for, by position or by id. The pages are shared through
+the OS cache, so any number of processes can open the same snapshot
+without copying it:
+
+    python -m src.utils.mapped data/sessions.json data/sessions.map
+"""
+import argparse
+import json
+import mmap
+import struct
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from src.utils.atomic import atomic_open
+
+MAGIC = b"SWMAP\x01\x00\x00"
+# magic, sessions, sets, then offsets of the session table, set table,
+# id index and heap, and the heap reference of the JSON source stamp
+HEADER = struct.Struct("<8sQQQQQQII")
+
+# Known keys get a fixed slot; anything else, or a value of an unexpected
+# type, goes into the record's JSON "extra" string so sessions round-trip
+SESSION_FIELDS = (
+    ("id", "int"), ("date", "str"), ("pool_length", "num"), ("total_distance", "num"),
+    ("total_time", "num"), ("notes", "str"), ("created_at", "str"),
+)
+SET_FIELDS = (
+    ("distance", "num"), ("time", "num"), ("stroke", "str"), ("repetitions", "num"),
+    ("rest", "num"), ("description", "str"), ("mixed_strokes", "json"),
+)
+FIELD_FORMATS = {"int": "q", "num": "d", "str": "II", "json": "II"}
+# Largest integer a float64 slot holds exactly
+MAX_EXACT_INT = 2 ** 53
+
+
+def _record(fields: tuple, tail: str) -> struct.Struct:
+    """Field slots, then ``tail``, the extra JSON reference and the present/int bitmasks"""
+    return struct.Struct("<" + "".join(FIELD_FORMATS[kind] for _, kind in fields) + tail + "IIHH")
+
+
+SESSION_RECORD = _record(SESSION_FIELDS, "II")  # + first set, set count
+# Present bit of a session whose sets are in the set table
+SETS_IN_TABLE = 1 << len(SESSION_FIELDS)
+SET_RECORD = _record(SET_FIELDS, "")
+ID_ENTRY = struct.Struct("<qI")
+
+
+class _Heap:
+    """Deduplicated UTF-8 string storage"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.refs = {}
+
+    def add(self, text: str) -> tuple:
+        ref = self.refs.get(text)
+        if ref is None:
+            encoded = text.encode("utf-8")
+            ref = self.refs[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return ref
+
+
+def _pack(record: struct.Struct, fields: tuple, data: dict, heap: _Heap, tail: tuple,
+          flags: int = 0, skip: tuple = ()) -> bytes:
+    values = []
+    extra = {}
+    present = flags
+    ints = 0
+    for bit, (key, kind) in enumerate(fields):
+        value = data.get(key)
+        fits = False
+        if kind == "int":
+            fits = type(value) is int and -2 ** 63 <= value < 2 ** 63
+        elif kind == "num":
+            fits = type(value) is float or (type(value) is int and abs(value) <= MAX_EXACT_INT)
+        elif kind == "str":
+            fits = type(value) is str
+        elif kind == "json":
+            fits = isinstance(value, list)
+
+        if fits:
+            present |= 1 << bit
+            if kind == "str":
+                values.extend(heap.add(value))
+            elif kind == "json":
+                values.extend(heap.add(json.dumps(value)))
+            else:
+                if type(value) is int:
+                    ints |= 1 << bit
+                values.append(value)
+        else:
+            if key in data:
+                extra[key] = value
+            values.extend((0, 0) if kind in ("str", "json") else (0,))
+
+    known = {key for key, _ in fields}
+    extra.update((k, v) for k, v in data.items() if k not in known and k not in skip)
+    extra_ref = heap.add(json.dumps(extra, default=str)) if extra else (0, 0)
+    return record.pack(*values, *tail, *extra_ref, present, ints)
+
+
+def write_mapped(path: Path, sessions, source=None) -> int:
+    """Write ``sessions`` (an iterable of dicts, kept in order) as a snapshot; returns the count.
+
+    ``source`` is any JSON value identifying what the snapshot was built
+    from, so readers can tell when it is stale.
+    """
+    heap = _Heap()
+    session_table = bytearray()
+    set_table = bytearray()
+    ids = []
+    set_count = 0
+    count = 0
+    for session in sessions:
+        sets = session.get("sets")
+        if isinstance(sets, list) and all(isinstance(s, dict) for s in sets):
+            for set_data in sets:
+                set_table += _pack(SET_RECORD, SET_FIELDS, set_data, heap, ())
+            session_table += _pack(
+                SESSION_RECORD, SESSION_FIELDS, session, heap, (set_count, len(sets)),
+                flags=SETS_IN_TABLE, skip=("sets",)
+            )
+            set_count += len(sets)
+        else:
+            # No sets, or sets the set table can't hold: they stay in the extra JSON
+            session_table += _pack(SESSION_RECORD, SESSION_FIELDS, session, heap, (0, 0))
+        session_id = session.get("id")
+        if type(session_id) is int and -2 ** 63 <= session_id < 2 ** 63:
+            ids.append((session_id, count))
+        count += 1
+
+    # Stable sort, so the first of any repeated legacy id is found first
+    ids.sort(key=lambda entry: entry[0])
+    id_index = b"".join(ID_ENTRY.pack(*entry) for entry in ids)
+    source_ref = heap.add(json.dumps(source, default=str))
+
+    sessions_at = HEADER.size
+    sets_at = sessions_at + len(session_table)
+    ids_at = sets_at + len(set_table)
+    heap_at = ids_at + len(id_index)
+    header = HEADER.pack(MAGIC, count, set_count, sessions_at, sets_at, ids_at, heap_at, *source_ref)
+    with atomic_open(path, "wb") as file:
+        for part in (header, session_table, set_table, id_index, heap.data):
+            file.write(part)
+    return count
+
+
+class MappedSessions:
+    """Sessions of a snapshot written by write_mapped(), decoded on access.
+
+    Behaves as a read-only sequence of session dicts in the order they
+    were written (Database writes them by date, then id), with get() for
+    lookups by id. Pickling it hands the path to the other process, which
+    maps the same file rather than receiving a copy.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, self._count, self._set_count, self._sessions_at, self._sets_at,
+             self._ids_at, self._heap_at, *self._source_ref) = HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            self._map.close()
+            raise ValueError(f"Not a session snapshot: {self.path}")
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a session snapshot: {self.path}")
+        self._id_count = (self._heap_at - self._ids_at) // ID_ENTRY.size
+
+    def __reduce__(self):
+        return (MappedSessions, (str(self.path),))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    @property
+    def source(self):
+        """The ``source`` stamp the snapshot was written with"""
+        return json.loads(self._text(*self._source_ref))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("session index out of range")
+        return self._session(index)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._session(index)
+
+    def _text(self, offset: int, length: int) -> str:
+        start = self._heap_at + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def _unpack(self, record: struct.Struct, fields: tuple, offset: int) -> tuple:
+        """(data dict, tail values, present bits) of the record at ``offset``"""
+        values = record.unpack_from(self._map, offset)
+        present, ints = values[-2], values[-1]
+        data = {}
+        position = 0
+        for bit, (key, kind) in enumerate(fields):
+            if kind in ("str", "json"):
+                if present & (1 << bit):
+                    text = self._text(values[position], values[position + 1])
+                    data[key] = text if kind == "str" else json.loads(text)
+                position += 2
+            else:
+                if present & (1 << bit):
+                    value = values[position]
+                    data[key] = int(value) if ints & (1 << bit) else value
+                position += 1
+        tail = values[position:-4]
+        extra_offset, extra_length = values[-4], values[-3]
+        if extra_length:
+            data.update(json.loads(self._text(extra_offset, extra_length)))
+        return data, tail, present
+
+    def _session(self, index: int) -> dict:
+        session, (first_set, set_count), present = self._unpack(
+            SESSION_RECORD, SESSION_FIELDS, self._sessions_at + index * SESSION_RECORD.size
+        )
+        if present & SETS_IN_TABLE:
+            session["sets"] = [
+                self._unpack(SET_RECORD, SET_FIELDS, self._sets_at + i * SET_RECORD.size)[0]
+                for i in range(first_set, first_set + set_count)
+            ]
+        return session
+
+    def key(self, index: int) -> tuple:
+        """session_key() of the session at ``index``, without decoding the rest of it"""
+        values = SESSION_RECORD.unpack_from(self._map, self._sessions_at + index * SESSION_RECORD.size)
+        present = values[-2]
+        session_id = values[0] if present & 1 else 0
+        date = self._text(values[1], values[2]) if present & 2 else ""
+        return (date, session_id)
+
+    def index_of(self, session_id: int):
+        """Position of the session with ``session_id``, or None; a binary search of the id index"""
+        lo, hi = 0, self._id_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ID_ENTRY.unpack_from(self._map, self._ids_at + mid * ID_ENTRY.size)[0] < session_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._id_count:
+            found, index = ID_ENTRY.unpack_from(self._map, self._ids_at + lo * ID_ENTRY.size)
+            if found == session_id:
+                return index
+        return None
+
+    def get(self, session_id: int):
+        """The session with ``session_id``, or None"""
+        index = self.index_of(session_id)
+        return None if index is None else self._session(index)
+
+    def page(self, order: str, limit=None, cursor=None) -> list:
+        """Up to ``limit`` sessions after ``cursor`` in (date, id) order, like CachedSessions.page.
+
+        Only valid for snapshots written in session_key() order.
+        """
+        keys = _Keys(self)
+        if order == "asc":
+            start = bisect_right(keys, tuple(cursor)) if cursor else 0
+            end = self._count if limit is None else min(start + limit, self._count)
+            return [self._session(i) for i in range(start, end)]
+        end = bisect_left(keys, tuple(cursor)) if cursor else self._count
+        start = 0 if limit is None else max(end - limit, 0)
+        return [self._session(i) for i in range(end - 1, start - 1, -1)]
+
+
+class _Keys:
+    """The snapshot's session keys as a sequence bisect can search"""
+
+    def __init__(self, mapped: MappedSessions):
+        self.mapped = mapped
+
+    def __len__(self) -> int:
+        return len(self.mapped)
+
+    def __getitem__(self, index: int) -> tuple:
+        return self.mapped.key(index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a memory-mapped snapshot of a sessions file")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("target", type=Path)
+    args = parser.parse_args(argv)
+
+    from src.utils.database import session_key
+    from src.utils.serializers import iter_sessions
+    sessions = sorted(iter_sessions(args.source), key=session_key)
+    count = write_mapped(args.target, sessions)
+    print(f"Wrote {count} sessions to {args.target} ({args.target.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import re
+from bisect import bisect_left, insort
+
+TOKEN_PATTERN = re.compile(r"\w+(?:-\w+)*")
+
+
+def tokenize(text: str) -> set:
+    """Lowercase words; hyphenated words (and dates) also yield their parts"""
+    tokens = set()
+    for match in TOKEN_PATTERN.findall(str(text).lower()):
+        tokens.add(match)
+        if "-" in match:
+            tokens.update(match.split("-"))
+    return tokens
+
+
+def session_tokens(session) -> set:
+    """Searchable words of a session: date, notes, set strokes and descriptions"""
+    tokens = tokenize(session.get("date") or "")
+    tokens |= tokenize(session.get("notes") or "")
+    for set_data in session.get("sets") or ():
+        tokens |= tokenize(set_data.get("stroke") or "")
+        tokens |= tokenize(set_data.get("description") or "")
+        for stroke in set_data.get("mixed_strokes") or ():
+            tokens |= tokenize(stroke)
+    return tokens
+
+
+class SearchIndex:
+    """Inverted index from words to sessions with prefix lookups.
+
+    Every query word must prefix-match a word of the session, so typing
+    "fre 2024-0" narrows as you go. The index is updated per session, so
+    saves and deletes don't rebuild it. Results come back in descending
+    ``sort_key`` order (by id when no key is given).
+
+    Sessions are indexed under an entry number rather than their id,
+    since legacy histories can repeat an id.
+    """
+
+    def __init__(self, sessions=(), sort_key=None):
+        self.sort_key = sort_key
+        self.sessions = {}      # entry -> session
+        self.entries = {}       # id -> entry of the first session with that id
+        self.duplicates = {}    # id -> entries of later sessions with that id
+        self.postings = {}      # token -> set of entries
+        self.vocabulary = []    # sorted tokens, for prefix ranges
+        self.order = []         # sorted (sort key, id, entry) of every session
+        self.ordered_entries = []  # the entries of ``order``, for fast scans
+        self.signature = None
+        self._next_entry = 0
+        postings = self.postings
+        for session in sessions:
+            entry = self._new_entry(session)
+            for token in session_tokens(session):
+                postings.setdefault(token, set()).add(entry)
+        self.vocabulary = sorted(postings)
+        self.order = sorted(self._order_entry(entry) for entry in self.sessions)
+        self.ordered_entries = [entry for _, _, entry in self.order]
+
+    def _new_entry(self, session) -> int:
+        entry = self._next_entry
+        self._next_entry += 1
+        self.sessions[entry] = session
+        session_id = session.get("id")
+        if session_id in self.entries:
+            self.duplicates.setdefault(session_id, []).append(entry)
+        else:
+            self.entries[session_id] = entry
+        return entry
+
+    def add(self, session):
+        """Index a new session, or replace the first one with its id like the stores' update()"""
+        entry = self.entries.get(session.get("id"))
+        if entry is None:
+            entry = self._new_entry(session)
+        else:
+            self._unindex(entry)
+            self.sessions[entry] = session
+        self._index(entry)
+
+    def remove(self, session_id):
+        """Drop every session with ``session_id``, like the stores' delete()"""
+        entry = self.entries.pop(session_id, None)
+        if entry is None:
+            return
+        for entry in [entry] + self.duplicates.pop(session_id, []):
+            self._unindex(entry)
+            del self.sessions[entry]
+
+    def update(self, session):
+        self.add(session)
+
+    def _index(self, entry: int):
+        order_entry = self._order_entry(entry)
+        position = bisect_left(self.order, order_entry)
+        self.order.insert(position, order_entry)
+        self.ordered_entries.insert(position, entry)
+        for token in session_tokens(self.sessions[entry]):
+            entries = self.postings.get(token)
+            if entries is None:
+                entries = self.postings[token] = set()
+                insort(self.vocabulary, token)
+            entries.add(entry)
+
+    def _unindex(self, entry: int):
+        position = bisect_left(self.order, self._order_entry(entry))
+        del self.order[position]
+        del self.ordered_entries[position]
+        for token in session_tokens(self.sessions[entry]):
+            entries = self.postings.get(token)
+            if entries is None:
+                continue
+            entries.discard(entry)
+            if not entries:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def _order_entry(self, entry: int) -> tuple:
+        session = self.sessions[entry]
+        session_id = session.get("id") or 0
+        key = self.sort_key(session) if self.sort_key else session_id
+        return (key, session_id, entry)
+
+    def _prefix_matches(self, prefix: str) -> set:
+        found = []
+        start = bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            found.append(self.postings[token])
+        # A single posting set is returned as is, callers never mutate it
+        return found[0] if len(found) == 1 else set().union(*found)
+
+    def search(self, query: str, limit=None) -> list:
+        """Sessions matching every word of ``query``, newest first"""
+        words = sorted(tokenize(query), key=len, reverse=True)
+        if not words:
+            return []
+        matches = None
+        for word in words:
+            found = self._prefix_matches(word)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        if len(matches) * 16 > len(self.order):
+            # Broad query: walking the presorted order beats sorting the matches
+            entries = [entry for entry in reversed(self.ordered_entries) if entry in matches]
+        else:
+            entries = sorted(matches, key=self._order_entry, reverse=True)
+        if limit is not None:
+            entries = entries[:limit]
+        return [self.sessions[entry] for entry in entries]
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+
+@contextmanager
+def file_lock(lock_path: Path, timeout: float = 5.0):
+    """Cross-process lock held by exclusively creating ``lock_path``.
+
+    A lock older than ``timeout`` is assumed to belong to a writer that
+    crashed and is broken.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.monotonic() > deadline:
+                try:
+                    os.unlink(lock_path)
+                except FileNotFoundError:
+                    pass
+                deadline = time.monotonic() + timeout
+            time.sleep(0.005)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.unlink(lock_path)
+
+
+class IdSequence:
+    """Monotonic session id counter persisted in its own small file.
+
+    Allocation reads and bumps the counter under a file lock, so it costs
+    the same no matter how many sessions exist and stays unique across
+    processes.  ``seed`` returns one past the largest stored id; it is
+    called when the counter file is missing, e.g. the first time an
+    existing history is opened, and whenever ``signature`` shows the
+    store changed since this process last wrote it (a restore or copy
+    from outside the app), so stored ids are never handed out again.
+    """
+
+    def __init__(self, path: Path, seed: Callable[[], int], signature: Callable[[], object] = None):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(self.path.suffix + ".lock")
+        self._seed = seed
+        self._signature = signature
+        self._synced = None
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Record the store's signature after our own write, so it isn't rescanned"""
+        if self._signature is not None:
+            self._synced = self._signature()
+
+    def next_id(self) -> int:
+        with self._lock, file_lock(self.lock_path):
+            try:
+                next_id = int(self.path.read_text())
+            except (FileNotFoundError, ValueError):
+                next_id = self._seed()
+            else:
+                if self._signature is not None and self._signature() != self._synced:
+                    next_id = max(next_id, self._seed())
+                    self.sync()
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp_path.write_text(str(next_id + 1))
+            os.replace(tmp_path, self.path)
+            return next_id
+
+
+def next_free_id(sessions) -> int:
+    """One past the largest integer id in ``sessions``"""
+    return max((s.get("id") for s in sessions if isinstance(s.get("id"), int)), default=0) + 1
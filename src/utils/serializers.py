@@ -0,0 +1,475 @@
+"""On-disk formats for sessions.json.
+
+The file keeps its name whatever the format; loads() tells the formats
+apart by their first bytes, so switching SESSIONS_FORMAT needs no
+migration and older files stay readable. Convert an existing file with:
+
+    python -m src.utils.serializers data/sessions.json --to columnar
+"""
+import argparse
+import json
+import re
+import struct
+import sys
+from array import array
+from itertools import islice
+from pathlib import Path
+
+from src.utils.atomic import atomic_open, atomic_write_bytes
+
+
+class JsonSerializer:
+    """Indented JSON, the original human-readable format"""
+
+    name = "json"
+
+    def dumps(self, document) -> bytes:
+        return json.dumps(document, indent=2, default=str).encode("utf-8")
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+    def matches(self, data: bytes) -> bool:
+        return data.lstrip()[:1] in (b"{", b"[")
+
+
+class CompactJsonSerializer(JsonSerializer):
+    """JSON without indentation or spaces after separators"""
+
+    name = "json-compact"
+
+    def dumps(self, document) -> bytes:
+        return json.dumps(document, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class MsgpackSerializer:
+    """MessagePack; needs the optional msgpack package"""
+
+    name = "msgpack"
+
+    @staticmethod
+    def _msgpack():
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError("The msgpack format needs the msgpack package: pip install msgpack")
+        return msgpack
+
+    def dumps(self, document) -> bytes:
+        return self._msgpack().packb(document, use_bin_type=True, default=str)
+
+    def loads(self, data: bytes):
+        return self._msgpack().unpackb(data, raw=False, strict_map_key=False)
+
+    def matches(self, data: bytes) -> bool:
+        # A top-level map or array: fixmap, fixarray, array 16/32, map 16/32
+        return bool(data) and (0x80 <= data[0] <= 0x9f or data[0] in (0xdc, 0xdd, 0xde, 0xdf))
+
+
+def _copier(value):
+    """How to copy ``value`` for each row it appears in; None if it's immutable"""
+    if not isinstance(value, (list, dict)):
+        return None
+    items = value.values() if isinstance(value, dict) else value
+    if any(isinstance(item, (list, dict)) for item in items):
+        return lambda nested: json.loads(json.dumps(nested))
+    return type(value).copy
+
+
+class _Missing:
+    """Placeholder for a key a row doesn't have"""
+
+
+MISSING = _Missing()
+CODE_TYPES = ("B", "H", "I")
+
+
+class ColumnarSerializer:
+    """Column-per-key binary layout with dictionary-encoded strings.
+
+    Sessions and their sets are stored as two tables. Integer and float
+    columns are packed arrays; every other column (strokes, notes,
+    descriptions, mixed_strokes) is a table of distinct values plus an
+    array of codes into it. Layout: MAGIC, a little-endian uint32 header
+    length, the JSON header describing the columns, then the column blobs.
+    """
+
+    name = "columnar"
+    MAGIC = b"SWCOL\x01"
+
+    def dumps(self, document) -> bytes:
+        blobs = []
+        if isinstance(document, list):
+            header = {"layout": "list", "meta": {}}
+            sessions = document
+        else:
+            header = {"layout": "dict"}
+            header["meta"] = {k: v for k, v in document.items() if k != "sessions"}
+            sessions = document.get("sessions", [])
+        header["byteorder"] = sys.byteorder
+        header["sessions"] = self._encode_table(sessions, blobs, nested="sets")
+        header["blobs"] = [len(blob) for blob in blobs]
+        header_bytes = json.dumps(header, default=str).encode("utf-8")
+        return b"".join([self.MAGIC, struct.pack("<I", len(header_bytes)), header_bytes, *blobs])
+
+    def loads(self, data: bytes):
+        view = memoryview(data)
+        start = len(self.MAGIC)
+        header_length, = struct.unpack_from("<I", view, start)
+        start += 4
+        header = json.loads(bytes(view[start:start + header_length]))
+        start += header_length
+        blobs = []
+        for length in header["blobs"]:
+            blobs.append(view[start:start + length])
+            start += length
+
+        sessions = self._decode_table(header["sessions"], blobs, header["byteorder"])
+        if header["layout"] == "list":
+            return sessions
+        return dict(header["meta"], sessions=sessions)
+
+    def matches(self, data: bytes) -> bool:
+        return data.startswith(self.MAGIC)
+
+    def _encode_table(self, rows: list, blobs: list, nested: str = None) -> dict:
+        keys = {}
+        for row in rows:
+            keys.update(dict.fromkeys(row))
+        columns = []
+        for key in keys:
+            values = [row.get(key, MISSING) for row in rows]
+            missing = [i for i, value in enumerate(values) if value is MISSING]
+            column = {"key": key}
+            if missing:
+                column["missing"] = self._add_blob(blobs, array("I", missing))
+            present = [value for value in values if value is not MISSING]
+
+            if key == nested and all(
+                isinstance(value, list) and all(isinstance(item, dict) for item in value)
+                for value in present
+            ):
+                column["kind"] = "table"
+                counts = [len(value) if value is not MISSING else 0 for value in values]
+                column["counts"] = self._add_blob(blobs, array("I", counts))
+                column["table"] = self._encode_table(
+                    [item for value in present for item in value], blobs
+                )
+            elif present and all(type(value) is int for value in present) and \
+                    -2 ** 63 <= min(present) and max(present) < 2 ** 63:
+                column["kind"] = "int"
+                column["data"] = self._add_blob(
+                    blobs, array("q", [0 if v is MISSING else v for v in values])
+                )
+            elif present and all(type(value) is float for value in present):
+                column["kind"] = "float"
+                column["data"] = self._add_blob(
+                    blobs, array("d", [0.0 if v is MISSING else v for v in values])
+                )
+            else:
+                column["kind"] = "values"
+                table, codes = self._dictionary_encode(values, bool(missing))
+                column["values"] = self._add_blob(blobs, json.dumps(table, default=str).encode("utf-8"))
+                column["codes"] = self._add_blob(blobs, codes)
+                column["code_type"] = codes.typecode
+            columns.append(column)
+        return {"rows": len(rows), "columns": columns}
+
+    @staticmethod
+    def _dictionary_encode(values: list, has_missing: bool) -> tuple:
+        table = []
+        codes_by_value = {}
+        codes = []
+        # Code 0 stands for a missing value when there are any
+        first_code = int(has_missing)
+        for value in values:
+            if value is MISSING:
+                codes.append(0)
+                continue
+            # Tagged so a string never collides with the JSON text of another value
+            key = value if type(value) is str else (json.dumps(value, sort_keys=True, default=str),)
+            code = codes_by_value.get(key)
+            if code is None:
+                code = codes_by_value[key] = len(table) + first_code
+                table.append(value)
+            codes.append(code)
+        code_type = next(t for t in CODE_TYPES if len(table) + first_code <= 256 ** array(t).itemsize)
+        return table, array(code_type, codes)
+
+    @staticmethod
+    def _add_blob(blobs: list, data) -> int:
+        if isinstance(data, array):
+            data = data.tobytes()
+        blobs.append(data)
+        return len(blobs) - 1
+
+    @staticmethod
+    def _array(typecode: str, blob, byteorder: str) -> array:
+        values = array(typecode)
+        values.frombytes(blob)
+        if byteorder != sys.byteorder:
+            values.byteswap()
+        return values
+
+    def _decode_table(self, table: dict, blobs: list, byteorder: str) -> list:
+        rows = table["rows"]
+        keys = []
+        columns = []
+        missing = []
+        for column in table["columns"]:
+            kind = column["kind"]
+            if kind == "table":
+                counts = self._array("I", blobs[column["counts"]], byteorder)
+                items = iter(self._decode_table(column["table"], blobs, byteorder))
+                values = [list(islice(items, count)) for count in counts]
+            elif kind in ("int", "float"):
+                values = self._array("q" if kind == "int" else "d", blobs[column["data"]], byteorder).tolist()
+            else:
+                decoded = json.loads(bytes(blobs[column["values"]]))
+                if "missing" in column:
+                    decoded.insert(0, None)
+                codes = self._array(column["code_type"], blobs[column["codes"]], byteorder)
+                copiers = [_copier(value) for value in decoded]
+                if any(copiers):
+                    # Every row gets its own list or dict, never a shared one
+                    values = [copiers[code](decoded[code]) if copiers[code] else decoded[code]
+                              for code in codes]
+                else:
+                    values = [decoded[code] for code in codes]
+            keys.append(column["key"])
+            columns.append(values)
+            if "missing" in column:
+                missing.append((column["key"], self._array("I", blobs[column["missing"]], byteorder)))
+
+        if columns:
+            result = [dict(zip(keys, values)) for values in zip(*columns)]
+        else:
+            result = [{} for _ in range(rows)]
+        for key, indexes in missing:
+            for i in indexes:
+                del result[i][key]
+        return result
+
+
+SERIALIZERS = {
+    serializer.name: serializer
+    for serializer in (JsonSerializer(), CompactJsonSerializer(), MsgpackSerializer(), ColumnarSerializer())
+}
+
+
+def register_serializer(serializer):
+    """Add a format: an object with ``name``, ``dumps``, ``loads`` and ``matches``"""
+    SERIALIZERS[serializer.name] = serializer
+
+
+def get_serializer(name: str):
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown sessions format: {name}")
+
+
+def detect(data: bytes):
+    """The serializer whose format ``data`` is in"""
+    for serializer in reversed(list(SERIALIZERS.values())):
+        if serializer.matches(data):
+            return serializer
+    raise ValueError("Unrecognized sessions file format")
+
+
+def dumps(document, format: str = "json") -> bytes:
+    return get_serializer(format).dumps(document)
+
+
+def loads(data: bytes):
+    """Parse a sessions document in any known format"""
+    return detect(data).loads(data)
+
+
+def read_document(path: Path):
+    return loads(Path(path).read_bytes())
+
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JsonStream:
+    """Incremental JSON reader over a text file, built on JSONDecoder.raw_decode.
+
+    Only the value being decoded and one chunk of look-ahead are held in
+    memory, however large the file is.
+    """
+
+    def __init__(self, file, chunk_size: int = 1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _read(self) -> bool:
+        """Append the next chunk, dropping what's been consumed; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or "" at the end of the file"""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of ``chars``"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in sessions file, found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            # A number that runs into the end of the buffer may go on in the next chunk
+            if end == len(self.buffer) and self._read():
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        """Yield the elements of the array whose "[" was just consumed"""
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def iter_json_sessions(file, meta: dict = None, chunk_size: int = 1 << 16):
+    """Yield the sessions of a JSON sessions file one at a time.
+
+    Handles both the ``{"sessions": [...]}`` and the legacy bare list
+    layout. Other top-level keys (like the journal's "seq") are stored in
+    ``meta`` as they are passed.
+    """
+    stream = JsonStream(file, chunk_size)
+    if stream.expect("{[") == "[":
+        # Handle legacy data format
+        yield from stream.items()
+    elif stream.peek() == "}":
+        stream.pos += 1
+    else:
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "sessions":
+                stream.expect("[")
+                yield from stream.items()
+            else:
+                value = stream.value()
+                if meta is not None:
+                    meta[key] = value
+            if stream.expect(",}") == "}":
+                break
+    if stream.peek():
+        raise ValueError("Unexpected data after the sessions in sessions file")
+
+
+def iter_sessions(path: Path, meta: dict = None):
+    """Yield the sessions of a sessions file in any format, streaming JSON ones"""
+    path = Path(path)
+    with open(path, "rb") as file:
+        head = file.read(64)
+    serializer = detect(head) if head.strip() else SERIALIZERS["json"]
+    if isinstance(serializer, JsonSerializer):
+        with open(path, encoding="utf-8-sig") as file:
+            yield from iter_json_sessions(file, meta)
+        return
+
+    # The binary formats are compact enough to decode in one go
+    document = read_document(path)
+    if isinstance(document, list):
+        yield from document
+        return
+    if meta is not None:
+        meta.update((k, v) for k, v in document.items() if k != "sessions")
+    yield from document.get("sessions", [])
+
+
+def write_json_sessions(file, sessions, meta: dict = None, compact: bool = False) -> int:
+    """Stream sessions into a text file as a sessions document; returns the count.
+
+    Produces the same text as the json (or json-compact) serializer would
+    for ``{"sessions": [...], **meta}``. ``meta`` is only read after the
+    last session, so it can be filled by iter_sessions() on the way.
+    """
+    count = 0
+    file.write('{"sessions":[' if compact else '{\n  "sessions": [')
+    for session in sessions:
+        if compact:
+            text = json.dumps(session, separators=(",", ":"), default=str)
+        else:
+            text = "\n    " + json.dumps(session, indent=2, default=str).replace("\n", "\n    ")
+        file.write("," + text if count else text)
+        count += 1
+    file.write("]" if compact or not count else "\n  ]")
+    for key, value in (meta or {}).items():
+        if compact:
+            file.write(f',{json.dumps(key)}:{json.dumps(value, separators=(",", ":"), default=str)}')
+        else:
+            value = json.dumps(value, indent=2, default=str).replace("\n", "\n  ")
+            file.write(f",\n  {json.dumps(key)}: {value}")
+    file.write("}" if compact else "\n}")
+    return count
+
+
+def convert(source: Path, format: str, target: Path = None) -> Path:
+    """Rewrite a sessions file in ``format``, in place unless ``target`` is given.
+
+    Conversions to JSON stream the sessions through, so files of any size
+    convert in constant memory.
+    """
+    source = Path(source)
+    target = Path(target) if target else source
+    if format in ("json", "json-compact"):
+        meta = {}
+        with atomic_open(target) as file:
+            write_json_sessions(file, iter_sessions(source, meta), meta, format == "json-compact")
+    else:
+        atomic_write_bytes(target, dumps(read_document(source), format))
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a sessions file between formats")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("--to", required=True, choices=sorted(SERIALIZERS))
+    parser.add_argument("--output", type=Path, help="write here instead of replacing the source")
+    args = parser.parse_args(argv)
+
+    before = args.source.stat().st_size
+    target = convert(args.source, args.to, args.output)
+    print(f"Wrote {target} as {args.to}: {before} -> {target.stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Deterministic synthetic training histories for load and scale testing.
+
+    python -m src.utils.synthetic --sessions 100000 --storage sqlite --data-dir bench_data
+
+The same config and seed always give the same sessions, in the schema
+written by SessionWindow, oldest first.
+"""
+import argparse
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+from src.utils.serializers import write_json_sessions
+
+STROKES = ("freestyle", "backstroke", "breaststroke", "butterfly")
+# Seconds per 100m for each stroke at an average club swimmer's pace
+PACE = {"freestyle": 95, "backstroke": 110, "breaststroke": 120, "butterfly": 115, "mix": 110}
+# Repetitions that fit each set distance
+REPETITIONS = {25: (4, 6, 8, 10, 12, 16), 50: (4, 6, 8, 10, 12), 100: (1, 3, 4, 5, 6, 8, 10),
+               200: (1, 2, 3, 4, 5), 400: (1, 2, 3), 800: (1, 2)}
+RESTS = (0, 10, 15, 20, 30, 45, 60)
+DESCRIPTIONS = ("warm-up", "main set", "kick", "pull", "drill", "sprint", "cool-down",
+                "technique", "threshold", "build", "descending", "easy recovery")
+NOTES = ("Felt strong today", "Tired legs after yesterday", "Focused on turns",
+         "Crowded lanes", "Worked on breathing every 3", "Good sprint times",
+         "Easy recovery swim", "Open water prep", "New personal best", "Shoulder felt tight")
+
+
+@dataclass
+class HistoryConfig:
+    sessions: int = 1000
+    seed: int = 0
+    end: date = date(2024, 12, 31)
+    sessions_per_week: float = 4.0
+    # Histories that would span longer than this get several sessions a day
+    max_years: int = 40
+    sets_per_session: tuple = (3, 10)
+    stroke_weights: dict = field(default_factory=lambda: {
+        "freestyle": 55, "backstroke": 14, "breaststroke": 12, "butterfly": 7, "mix": 12,
+    })
+    pool_weights: dict = field(default_factory=lambda: {25: 80, 50: 20})
+    notes_ratio: float = 0.3
+    description_ratio: float = 0.6
+    rest_ratio: float = 0.7
+
+
+def _cumulative(weights: dict) -> tuple:
+    """(choices, cumulative weights) for random.choices, built once per run"""
+    return list(weights), list(accumulate(weights.values()))
+
+
+def _weighted(rng: random.Random, table: tuple):
+    return rng.choices(table[0], cum_weights=table[1])[0]
+
+
+def _make_set(rng: random.Random, config: HistoryConfig, strokes: tuple, distances: list) -> dict:
+    stroke = _weighted(rng, strokes)
+    distance = rng.choice(distances)
+    pace = PACE.get(stroke, 105) * rng.uniform(0.85, 1.2)
+    set_data = {
+        "distance": distance,
+        "time": round(pace * distance / 100),
+        "stroke": stroke,
+        "repetitions": rng.choice(REPETITIONS[distance]),
+        "description": rng.choice(DESCRIPTIONS) if rng.random() < config.description_ratio else "",
+    }
+    if rng.random() < config.rest_ratio:
+        set_data["rest"] = rng.choice(RESTS)
+    if stroke == "mix":
+        chosen = set(rng.sample(STROKES, rng.randint(2, 4)))
+        set_data["mixed_strokes"] = [s for s in STROKES if s in chosen]
+    return set_data
+
+
+def generate(config: HistoryConfig = None):
+    """Yield ``config.sessions`` sessions with ids 1.. in date order"""
+    config = config or HistoryConfig()
+    rng = random.Random(config.seed)
+    span = min(config.sessions * 7 / config.sessions_per_week, config.max_years * 365)
+    start = config.end - timedelta(days=int(span))
+    mean_gap = span / max(config.sessions, 1)
+    offset = 0.0
+    strokes = _cumulative(config.stroke_weights)
+    pools = _cumulative(config.pool_weights)
+    distances = {pool: [d for d in REPETITIONS if d % pool == 0] for pool in config.pool_weights}
+
+    for session_id in range(1, config.sessions + 1):
+        day = min(start + timedelta(days=int(offset)), config.end)
+        offset += rng.expovariate(1 / mean_gap) if mean_gap else 0
+
+        pool_length = _weighted(rng, pools)
+        sets = [_make_set(rng, config, strokes, distances[pool_length])
+                for _ in range(rng.randint(*config.sets_per_session))]
+        yield {
+            "id": session_id,
+            "date": day.isoformat(),
+            "pool_length": pool_length,
+            "sets": sets,
+            "total_distance": sum(s["distance"] * s["repetitions"] for s in sets),
+            "total_time": sum(s["time"] * s["repetitions"] for s in sets),
+            "notes": rng.choice(NOTES) if rng.random() < config.notes_ratio else "",
+            "created_at": f"{day.isoformat()}T{rng.randint(6, 20):02d}:{rng.randint(0, 59):02d}:00",
+        }
+
+
+def write_json(path: Path, sessions) -> int:
+    """Stream sessions into a compact sessions.json file; returns the count"""
+    with open(path, "w", encoding="utf-8") as file:
+        return write_json_sessions(file, sessions, compact=True)
+
+
+def load_history(data_dir, config: HistoryConfig = None, storage: str = "json") -> int:
+    """Write a synthetic history where Database(data_dir, storage) will find it"""
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    if storage in ("json", "journal"):
+        # The journal backend uses sessions.json as its snapshot
+        return write_json(data_dir / "sessions.json", generate(config))
+    if storage == "sqlite":
+        from src.data.database import SqliteStore
+        store = SqliteStore(data_dir / "swimming.db")
+        try:
+            return store.bulk_insert(generate(config))
+        finally:
+            store.close()
+    raise ValueError(f"Unknown storage backend: {storage}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic swimming history")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--storage", default="json", choices=("json", "journal", "sqlite"))
+    parser.add_argument("--data-dir", type=Path, default=Path("data"))
+    parser.add_argument("--end", type=date.fromisoformat, default=HistoryConfig.end,
+                        help="date of the newest session (YYYY-MM-DD)")
+    parser.add_argument("--sessions-per-week", type=float, default=HistoryConfig.sessions_per_week)
+    parser.add_argument("--min-sets", type=int, default=HistoryConfig.sets_per_session[0])
+    parser.add_argument("--max-sets", type=int, default=HistoryConfig.sets_per_session[1])
+    args = parser.parse_args(argv)
+
+    config = HistoryConfig(
+        sessions=args.sessions, seed=args.seed, end=args.end,
+        sessions_per_week=args.sessions_per_week,
+        sets_per_session=(args.min_sets, args.max_sets),
+    )
+    count = load_history(args.data_dir, config, args.storage)
+    print(f"Wrote {count} sessions to {args.data_dir} ({args.storage})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.models.analytics import SessionColumns, period_start, rolling_mean
+from src.utils.database import Database
+
+def make_session(session_id, date, sets, total_time=600):
+    sets = [{"stroke": stroke, "distance": d, "time": 30, "repetitions": reps, "rest": 10}
+            for stroke, d, reps in sets]
+    total = sum(s["distance"] * s["repetitions"] for s in sets)
+    return {"id": session_id, "date": date, "sets": sets,
+            "total_distance": total, "total_time": total_time}
+
+SESSIONS = [
+    make_session(1, "2024-02-08", [("freestyle", 100, 4)]),
+    make_session(2, "2024-02-05", [("freestyle", 50, 2), ("butterfly", 50, 4)]),
+    make_session(3, "2024-03-01", [("backstroke", 200, 1), ("kick", 25, 4)]),
+]
+
+def test_columns_are_sorted_by_date():
+    columns = SessionColumns(SESSIONS)
+    assert columns.ids.tolist() == [2, 1, 3]
+    assert columns.dates.dtype == np.dtype("datetime64[D]")
+    assert columns.stroke_names[-1] == "kick"
+    assert columns.set_session.tolist() == [0, 0, 1, 2, 2]
+
+def test_period_start_weeks_begin_on_monday():
+    days = np.array(["2024-02-04", "2024-02-05", "2024-02-11", "2024-03-31"], dtype="datetime64[D]")
+    assert period_start(days, "week").astype(str).tolist() == [
+        "2024-01-29", "2024-02-05", "2024-02-05", "2024-03-25"]
+    assert period_start(days, "month").astype(str).tolist() == [
+        "2024-02-01", "2024-02-01", "2024-02-01", "2024-03-01"]
+
+def test_group_by_period_and_stroke():
+    columns = SessionColumns(SESSIONS)
+    starts, totals = columns.group_by("week")
+    assert starts.astype(str).tolist() == ["2024-02-05", "2024-02-26"]
+    assert totals.tolist() == [700, 300]
+
+    starts, totals = columns.group_by("month", "distance", stroke="freestyle")
+    assert totals.tolist() == [500]
+    _, counts = columns.group_by("month", "sessions", stroke="freestyle")
+    assert counts.tolist() == [2]
+    _, counts = columns.group_by("month", "sessions")
+    assert counts.tolist() == [2, 1]
+    assert columns.stroke_totals() == {"freestyle": 500, "butterfly": 200, "backstroke": 200, "kick": 100}
+
+def test_rolling_mean_and_percentiles():
+    assert np.allclose(rolling_mean([1, 2, 3, 4], 2)[1:], [1.5, 2.5, 3.5])
+    assert np.isnan(rolling_mean([1, 2, 3, 4], 2)[0])
+
+    columns = SessionColumns(SESSIONS)
+    days, means = columns.rolling("distance", days=7)
+    assert days[0] == np.datetime64("2024-02-05") and len(days) == 26
+    assert means[6] == pytest.approx(700 / 7)
+    assert columns.percentiles("distance", [50]).tolist() == [300]
+    assert columns.percentiles("pace", [0]).tolist() == [150]
+
+def test_database_columns_follow_the_cache(tmp_path):
+    db = Database(data_dir=tmp_path)
+    db.save_session(make_session(None, "2024-02-08", [("freestyle", 100, 4)]))
+    assert db.get_columns().distance.tolist() == [400]
+    db.save_session(make_session(None, "2024-02-09", [("freestyle", 100, 2)]))
+    assert db.get_columns().distance.tolist() == [400, 200]
+
+def test_lttb_keeps_ends_and_spikes():
+    from src.models.analytics import lttb
+    x = np.arange(10_000, dtype=float)
+    y = np.zeros(10_000)
+    y[5_000] = 100
+    picked = lttb(x, y, 200)
+    assert len(picked) == 200
+    assert picked[0] == 0 and picked[-1] == 9_999
+    assert 5_000 in picked
+    assert np.all(np.diff(picked) > 0)
+    assert lttb(x[:50], y[:50], 200).tolist() == list(range(50))
+
+def test_thin_to_grid_keeps_one_point_per_cell():
+    from src.models.analytics import thin_to_grid
+    x = np.repeat([0.0, 1.0], 500)
+    y = np.repeat([0.0, 1.0], 500)
+    assert thin_to_grid(x, y, 10, 10).tolist() == [0, 500]
+    assert len(thin_to_grid(np.random.rand(100_000), np.random.rand(100_000), 40, 30)) <= 1200
+
+def test_strokes_the_app_stores_get_fixed_codes():
+    from src.models.analytics import STROKES
+    from src.utils.synthetic import HistoryConfig, generate
+    # The generator writes the stroke values SetDialog offers, "mix" included
+    assert set(HistoryConfig().stroke_weights) == set(STROKES)
+    columns = SessionColumns(generate(HistoryConfig(sessions=200)))
+    assert columns.stroke_names == list(STROKES)
+    assert sorted(columns.stroke_totals()) == sorted(STROKES)
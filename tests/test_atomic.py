@@ -0,0 +1,57 @@
+import json
+import pytest
+from src.utils.atomic import AtomicWriter, atomic_write_text, backup_paths
+from src.utils.database import Database
+
+def test_atomic_write_rotates_backup_generations(tmp_path):
+    path = tmp_path / "sessions.json"
+    for version in range(5):
+        atomic_write_text(path, str(version), backups=3)
+    assert path.read_text() == "4"
+    assert [p.read_text() for p in backup_paths(path, 3)] == ["3", "2", "1"]
+    assert not (tmp_path / "sessions.json.4").exists()
+
+def test_failed_write_leaves_the_old_file_and_no_temp_file(tmp_path):
+    path = tmp_path / "sessions.json"
+    path.write_text("old")
+    writer = AtomicWriter(path, render=lambda value: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        writer.write("new")
+    assert path.read_text() == "old"
+    assert writer.pending is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["sessions.json"]
+
+def test_group_commit_coalesces_writes(tmp_path):
+    path = tmp_path / "sessions.json"
+    rendered = []
+    writer = AtomicWriter(path, lambda value: rendered.append(value) or value, group_commit_ms=60_000)
+    before = writer.signature()
+    writer.write("a")
+    writer.write("b")
+    assert writer.pending == "b" and not path.exists()
+    assert writer.signature() != before
+    writer.flush()
+    assert rendered == ["b"] and path.read_text() == "b"
+    assert writer.pending is None
+
+def test_corrupt_file_is_kept_and_newest_backup_restored(tmp_path):
+    db = Database(data_dir=tmp_path)
+    db.save_session({"date": "2024-02-08", "sets": []})
+    db.save_session({"date": "2024-02-09", "sets": []})
+    db.sessions_file.write_text('{"sessions": [{"id": 1, "da')
+
+    assert [s["date"] for s in db.get_sessions()] == ["2024-02-08"]
+    corrupt, = tmp_path.glob("sessions.json.corrupt-*")
+    assert corrupt.read_text().startswith('{"sessions"')
+    assert json.loads(db.sessions_file.read_text())["sessions"][0]["id"] == 1
+
+def test_json_store_group_commit_is_visible_before_it_is_written(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.utils.database.JSON_GROUP_COMMIT_MS", 60_000)
+    db = Database(data_dir=tmp_path)
+    db.save_session({"date": "2024-02-08", "sets": []})
+    db.save_session({"date": "2024-02-09", "sets": []})
+    assert len(Database(data_dir=tmp_path).get_sessions()) == 2
+    assert json.loads(db.sessions_file.read_text()) == {"sessions": []}
+
+    AtomicWriter.flush_all()
+    assert len(json.loads(db.sessions_file.read_text())["sessions"]) == 2
@@ -0,0 +1,103 @@
+import threading
+
+from src.utils.background import TkWorker
+
+class FakeWidget:
+    """Collects after() callbacks so the test can run the 'main loop' by hand"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.jobs[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, {}
+        for callback in jobs.values():
+            callback()
+
+def wait_for(worker, widget):
+    for _ in range(200):
+        widget.run_pending()
+        if not worker.busy:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("worker never finished")
+
+def test_result_is_delivered_on_the_polling_thread():
+    widget = FakeWidget()
+    worker = TkWorker(widget)
+    results = []
+    worker.submit(lambda cancelled: threading.get_ident(), lambda r: results.append((r, threading.get_ident())))
+    wait_for(worker, widget)
+    (worker_thread, delivered_on), = results
+    assert worker_thread != delivered_on == threading.get_ident()
+
+def test_newer_job_supersedes_the_running_one():
+    widget = FakeWidget()
+    worker = TkWorker(widget)
+    started = threading.Event()
+    release = threading.Event()
+    seen = []
+    results = []
+
+    def slow(cancelled):
+        started.set()
+        release.wait(1)
+        seen.append(cancelled.is_set())
+        return "slow"
+
+    worker.submit(slow, results.append)
+    started.wait(1)
+    worker.submit(lambda cancelled: "fast", results.append)
+    release.set()
+    wait_for(worker, widget)
+    assert results == ["fast"]
+    assert seen == [True]
+
+def test_cancel_drops_the_result_and_errors_go_to_on_error():
+    widget = FakeWidget()
+    worker = TkWorker(widget)
+    results = []
+    worker.submit(lambda cancelled: "late", results.append)
+    worker.cancel()
+    assert not worker.busy and widget.jobs == {}
+
+    errors = []
+    worker.submit(lambda cancelled: 1 / 0, results.append, errors.append)
+    wait_for(worker, widget)
+    assert results == []
+    assert isinstance(errors[0], ZeroDivisionError)
+
+def test_jobs_run_one_at_a_time_and_only_the_latest_waits():
+    widget = FakeWidget()
+    worker = TkWorker(widget)
+    started = threading.Event()
+    release = threading.Event()
+    ran = []
+    results = []
+
+    def job(name):
+        def work(cancelled):
+            ran.append((name, threading.get_ident()))
+            if name == "first":
+                started.set()
+                release.wait(1)
+            return name
+        return work
+
+    worker.submit(job("first"), results.append)
+    started.wait(1)
+    for name in ("second", "third", "latest"):
+        worker.submit(job(name), results.append)
+    release.set()
+    wait_for(worker, widget)
+    assert [name for name, _ in ran] == ["first", "latest"]
+    assert ran[0][1] == ran[1][1]
+    assert results == ["latest"]
@@ -0,0 +1,23 @@
+from benchmarks import startup
+
+def test_startup_harness_reports_storage_phases():
+    report = startup.run([10], gui=False)
+    result, = report["results"]
+    assert result["sessions"] == 10
+    assert set(result["phases"]) == {"import_database", "database_init", "load_sessions"}
+    assert result["gui"] == "disabled"
+
+def test_storage_benchmark_times_every_operation_per_backend():
+    from benchmarks import storage
+    from src.utils.journal import JournalStore
+    open_stores = set(JournalStore._instances)
+    report = storage.run([20], repeat=2)
+    # Every backend's store is closed, so the journal leaves no instance behind
+    assert set(JournalStore._instances) == open_stores
+    assert [r["storage"] for r in report["results"]] == ["json", "journal", "sqlite"]
+    for result in report["results"]:
+        operations = result["operations"]
+        assert {"get_sessions_cold", "save_session", "update_session", "delete_session"} <= set(operations)
+        assert all(stats["ops_per_s"] > 0 and stats["peak_kib"] >= 0 for stats in operations.values())
+    assert "legacy_get_all_sessions" in report["results"][-1]["operations"]
+    assert "sqlite@20" in storage.format_table(report)
@@ -17,4 +17,177 @@ def test_get_sessions_with_legacy_data(tmp_path):
     db.sessions_file.write_text(json.dumps([{"id": 1, "date": "2024-02-08"}]))
     sessions = db.get_sessions()
     assert isinstance(sessions, list)
-    assert len(sessions) == 1
\ No newline at end of file
+    assert len(sessions) == 1
+
+
+def test_get_sessions_is_cached_until_file_changes(tmp_path, monkeypatch):
+    db = Database(data_dir=tmp_path)
+    db.save_session({"date": "2024-02-08", "sets": []})
+    first = db.get_sessions()
+
+    loads = []
+    original_load = db.store.load
+    monkeypatch.setattr(db.store, "load", lambda: loads.append(1) or original_load())
+    assert Database(data_dir=tmp_path).get_sessions() == first
+    db.get_sessions()
+    assert loads == []
+
+    # An outside edit changes the file size and is picked up
+    db.sessions_file.write_text(json.dumps({"sessions": [{"id": 7, "date": "2024-03-01"}]}))
+    assert [s["id"] for s in db.get_sessions()] == [7]
+    assert loads == [1]
+
+
+def test_cached_sessions_are_read_only(tmp_path):
+    db = Database(data_dir=tmp_path)
+    db.save_session({"date": "2024-02-08", "sets": [{"stroke": "freestyle"}]})
+    session = db.get_sessions()[0]
+    with pytest.raises(TypeError):
+        session["date"] = "2024-01-01"
+    with pytest.raises(TypeError):
+        session["sets"].append({})
+    assert db.get_sessions()[0]["date"] == "2024-02-08"
+
+
+def test_nested_values_of_cached_sessions_are_read_only(tmp_path):
+    from src.utils.database import thaw
+    db = Database(data_dir=tmp_path)
+    db.save_session({"date": "2024-02-08", "sets": [{"stroke": "mix", "mixed_strokes": ["butterfly"]}]})
+    session = db.get_sessions()[0]
+    for sets in (dict(session)["sets"], {**session}["sets"], session.get("sets"), dict(session.items())["sets"]):
+        with pytest.raises(TypeError):
+            sets.append({})
+    for set_data in session["sets"]:
+        with pytest.raises(TypeError):
+            set_data["mixed_strokes"].append("freestyle")
+
+    editable = thaw(session)
+    editable["sets"][0]["mixed_strokes"].append("freestyle")
+    assert type(editable["sets"][0]) is dict
+    assert db.get_sessions()[0]["sets"][0]["mixed_strokes"] == ["butterfly"]
+
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite"])
+def test_ids_stay_unique_after_delete(tmp_path, storage):
+    db = Database(data_dir=tmp_path, storage=storage)
+    for day in ("2024-02-08", "2024-02-09", "2024-02-10"):
+        db.save_session({"date": day, "sets": []})
+    db.delete_session(2)
+    db.save_session({"date": "2024-02-11", "sets": []})
+
+    ids = [s["id"] for s in db.get_sessions()]
+    assert ids == [1, 3, 4]
+    assert db.update_session({"id": 4, "date": "2024-02-12", "sets": []})
+    assert [s["date"] for s in db.get_sessions()][-1] == "2024-02-12"
+
+
+def test_id_sequence_seeds_from_existing_history(tmp_path):
+    db = Database(data_dir=tmp_path)
+    db.sessions_file.write_text(json.dumps({"sessions": [{"id": 1}, {"id": 1}, {"id": 5}]}))
+    session = {"date": "2024-02-08", "sets": []}
+    db.save_session(session)
+    assert session["id"] == 6
+
+
+def test_ids_skip_sessions_restored_from_outside_the_app(tmp_path):
+    db = Database(data_dir=tmp_path)
+    db.save_session({"date": "2024-02-08", "sets": []})
+    restored = [{"id": i, "date": f"2024-01-0{i}", "sets": []} for i in range(1, 6)]
+    db.sessions_file.write_text(json.dumps({"sessions": restored}))
+    db.save_session({"date": "2024-02-09", "sets": []})
+    assert sorted(s["id"] for s in db.get_sessions()) == [1, 2, 3, 4, 5, 6]
+
+
+def test_id_allocation_is_unique_across_writers(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    Database(data_dir=tmp_path)
+
+    def allocate(_):
+        # A separate Database per call shares only the sequence file
+        return [Database(data_dir=tmp_path).store.next_id() for _ in range(20)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        ids = [i for batch in pool.map(allocate, range(4)) for i in batch]
+    assert sorted(ids) == list(range(1, 81))
+
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite"])
+def test_get_session_by_id(tmp_path, storage):
+    db = Database(data_dir=tmp_path, storage=storage)
+    for day in ("2024-02-08", "2024-02-09"):
+        db.save_session({"date": day, "sets": [{"stroke": "freestyle", "distance": 100}]})
+    assert db.get_session(2)["date"] == "2024-02-09"
+    assert db.get_session(2)["sets"][0]["distance"] == 100
+    assert db.get_session(99) is None
+
+
+def test_writes_emit_change_events(tmp_path):
+    from src.utils.database import session_events
+    events = []
+    unsubscribe = session_events.subscribe(lambda event, payload: events.append((event, payload)))
+    try:
+        db = Database(data_dir=tmp_path)
+        db.save_session({"date": "2024-02-08", "sets": []})
+        db.update_session({"id": 1, "date": "2024-02-09", "sets": []})
+        db.delete_session(1)
+        db.delete_session(1)
+    finally:
+        unsubscribe()
+
+    assert [event for event, _ in events] == ["insert", "update", "delete"]
+    assert events[1][1]["date"] == "2024-02-09"
+    assert events[2][1] == 1
+
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite"])
+def test_iter_sessions_pages_by_date(tmp_path, storage):
+    from src.utils.database import session_key
+    db = Database(data_dir=tmp_path, storage=storage)
+    for day in (5, 1, 3, 3, 2, 4):
+        db.save_session({"date": f"2024-02-0{day}", "sets": [{"stroke": "freestyle"}]})
+    assert db.count_sessions() == 6
+
+    first = list(db.iter_sessions(limit=4))
+    assert [s["date"][-1] for s in first] == ["5", "4", "3", "3"]
+    assert first[2]["id"] > first[3]["id"]
+    rest = list(db.iter_sessions(limit=4, cursor=session_key(first[-1])))
+    assert [s["date"][-1] for s in rest] == ["2", "1"]
+    assert rest[0]["sets"] == [{"stroke": "freestyle"}]
+
+    oldest = list(db.iter_sessions(order="asc", limit=2))
+    assert [s["date"][-1] for s in oldest] == ["1", "2"]
+
+
+def test_sessions_are_stored_and_dated_in_date_order(tmp_path):
+    from datetime import date
+    db = Database(data_dir=tmp_path)
+    for day in ("2024-02-09", "2024-02-07", "not a date", "2024-02-08"):
+        db.save_session({"date": day, "sets": []})
+
+    stored = json.loads(db.sessions_file.read_text())["sessions"]
+    assert [s["id"] for s in stored] == [2, 4, 1, 3]
+
+    days, sessions = db.dated_sessions_between()
+    assert days == (date(2024, 2, 7), date(2024, 2, 8), date(2024, 2, 9))
+    assert [s["id"] for s in sessions] == [2, 4, 1]
+
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite"])
+def test_sessions_between_dates(tmp_path, storage):
+    from datetime import date
+    from src.utils.database import session_cache
+    db = Database(data_dir=tmp_path, storage=storage)
+    for day in (9, 1, 5, 3, 7):
+        db.save_session({"date": f"2024-02-0{day}", "sets": [{"stroke": "freestyle"}]})
+
+    # A cold cache lets indexed stores answer the range themselves
+    session_cache.invalidate()
+    found = db.sessions_between("2024-02-03", date(2024, 2, 7))
+    assert [s["date"] for s in found] == ["2024-02-03", "2024-02-05", "2024-02-07"]
+    assert found[0]["sets"] == [{"stroke": "freestyle"}]
+
+    db.get_sessions()
+    assert [s["date"][-1] for s in db.sessions_between(end="2024-02-04")] == ["1", "3"]
+    assert [s["date"][-1] for s in db.sessions_between(start="2024-02-08")] == ["9"]
+    assert len(db.sessions_between()) == 5
+    assert db.sessions_between("2024-03-01", "2024-03-31") == []
@@ -0,0 +1,58 @@
+import json
+from src.utils.database import Database
+from src.utils.journal import JournalStore
+
+def make_session(date="2024-02-08"):
+    return {"date": date, "sets": [], "total_distance": 100, "total_time": 60}
+
+def test_journal_replays_after_reopen(tmp_path):
+    db = Database(data_dir=tmp_path, storage="journal")
+    db.save_session(make_session())
+    db.save_session(make_session("2024-02-09"))
+    db.delete_session(1)
+    db.store.close()
+
+    reopened = Database(data_dir=tmp_path, storage="journal")
+    sessions = reopened.get_sessions()
+    assert [s["date"] for s in sessions] == ["2024-02-09"]
+    reopened.store.close()
+
+def test_mutations_only_append_to_journal(tmp_path):
+    db = Database(data_dir=tmp_path, storage="journal")
+    db.save_session(make_session())
+    assert not db.sessions_file.exists()
+    lines = db.store.journal_file.read_text().splitlines()
+    assert json.loads(lines[-1])["op"] == "insert"
+    db.store.close()
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    store = JournalStore(tmp_path / "sessions.json", compact_threshold=1000)
+    for i in range(5):
+        store.insert(dict(make_session(), id=i))
+    store.compact()
+
+    data = json.loads(store.snapshot_file.read_text())
+    assert data["seq"] == 5
+    assert len(data["sessions"]) == 5
+    assert store.journal_file.read_text() == ""
+
+    # Records newer than the snapshot survive a restart
+    store.delete(0)
+    store._journal.close()
+    reopened = JournalStore(tmp_path / "sessions.json")
+    assert [s["id"] for s in reopened.load()] == [1, 2, 3, 4]
+
+def test_deletes_leave_index_consistent(tmp_path):
+    store = JournalStore(tmp_path / "sessions.json", compact_threshold=1000)
+    for i in range(1, 6):
+        store.insert(dict(make_session(), id=i))
+    assert store.delete(2)
+    assert store.update(dict(make_session("2024-03-01"), id=4))
+    assert store.get(2) is None
+    assert store.get(4)["date"] == "2024-03-01"
+
+    store.compact()
+    # The snapshot is kept in date order, so the moved session comes last
+    assert [s["id"] for s in store.load()] == [1, 3, 5, 4]
+    assert store.update(dict(make_session("2024-03-02"), id=5))
+    assert store.get(5)["date"] == "2024-03-02"
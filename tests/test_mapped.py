@@ -0,0 +1,87 @@
+import pickle
+import pytest
+from src.utils.database import CachedSessions, Database, session_key
+from src.utils.mapped import MappedSessions, write_mapped
+from src.utils.synthetic import HistoryConfig, generate
+
+def sample_sessions():
+    sessions = list(generate(HistoryConfig(sessions=40, seed=2)))
+    # Shapes the fixed-width slots can't hold still round-trip
+    sessions += [
+        {"id": 100, "date": "2024-01-01", "sets": "weird", "pool_length": 33.3, "flag": True, "notes": None},
+        {"date": "2024-01-02"},
+        {"id": 101, "sets": [{"stroke": 3, "distance": 1.5, "x": [1]}], "total_time": 2 ** 60},
+        {"id": 1, "date": "2030-01-01", "sets": []},
+    ]
+    return sessions
+
+def test_round_trip_and_random_access(tmp_path):
+    sessions = sample_sessions()
+    path = tmp_path / "sessions.map"
+    assert write_mapped(path, sessions, source={"v": 1}) == len(sessions)
+    with MappedSessions(path) as mapped:
+        assert list(mapped) == sessions
+        assert len(mapped) == len(sessions)
+        assert mapped[-1] == sessions[-1] and mapped[3:6] == sessions[3:6]
+        assert mapped.get(101) == sessions[-2]
+        # Repeated legacy ids resolve to the first session, like CachedSessions.by_id
+        assert mapped.get(1) == sessions[0]
+        assert mapped.get(999) is None
+        assert mapped.source == {"v": 1}
+        with pytest.raises(IndexError):
+            mapped[len(sessions)]
+
+def test_page_matches_cached_sessions(tmp_path):
+    sessions = sorted(sample_sessions(), key=session_key)
+    cached = CachedSessions(None, sessions)
+    write_mapped(tmp_path / "sessions.map", cached.ordered)
+    with MappedSessions(tmp_path / "sessions.map") as mapped:
+        for order in ("asc", "desc"):
+            for limit, cursor in [(None, None), (5, None), (5, session_key(sessions[10])), (3, ("2024-01-01", 0))]:
+                assert mapped.page(order, limit, cursor) == cached.page(order, limit, cursor)
+
+def test_pickling_shares_the_file_instead_of_copying(tmp_path):
+    path = tmp_path / "sessions.map"
+    write_mapped(path, generate(HistoryConfig(sessions=500)))
+    with MappedSessions(path) as mapped:
+        data = pickle.dumps(mapped)
+        assert len(data) < 200
+        with pickle.loads(data) as copy:
+            assert copy[123] == mapped[123]
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / "sessions.map").write_bytes(b'{"sessions": []}')
+    with pytest.raises(ValueError):
+        MappedSessions(tmp_path / "sessions.map")
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite"])
+def test_database_rebuilds_the_snapshot_only_when_the_store_changes(tmp_path, storage):
+    db = Database(data_dir=tmp_path, storage=storage)
+    db.save_session({"date": "2024-02-08", "sets": [{"stroke": "freestyle", "distance": 100}]})
+    with db.mapped_sessions() as mapped:
+        assert [s["id"] for s in mapped] == [1]
+        assert mapped.path == tmp_path / "sessions.1.map"
+    built = mapped.path.stat().st_mtime_ns
+    with db.mapped_sessions() as mapped:
+        assert len(mapped) == 1
+    assert mapped.path.stat().st_mtime_ns == built
+
+    db.save_session({"date": "2024-02-07", "sets": []})
+    with db.mapped_sessions() as mapped:
+        assert [s["id"] for s in mapped] == [2, 1]
+        assert mapped.get(1)["sets"][0]["distance"] == 100
+
+def test_rebuilding_writes_a_new_snapshot_while_the_old_one_is_open(tmp_path):
+    db = Database(data_dir=tmp_path)
+    db.save_session({"date": "2024-02-08", "sets": []})
+    old = db.mapped_sessions()
+    db.save_session({"date": "2024-02-07", "sets": []})
+    with db.mapped_sessions() as mapped:
+        assert mapped.path == tmp_path / "sessions.2.map"
+        assert [s["date"] for s in mapped] == ["2024-02-07", "2024-02-08"]
+        # The open snapshot keeps reading the version it mapped
+        assert [s["id"] for s in old] == [1]
+    old.close()
+    db.save_session({"date": "2024-02-09", "sets": []})
+    db.mapped_sessions().close()
+    assert sorted(p.name for p in tmp_path.glob("*.map")) == ["sessions.3.map"]
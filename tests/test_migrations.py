@@ -0,0 +1,106 @@
+import json
+import sqlite3
+import pytest
+from src.data.database import SqliteStore
+from src.data.migrations import Migration, MigrationManager, table_columns, table_exists
+from src.utils.database import Database
+
+def make_legacy_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+    CREATE TABLE swimming_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        duration INTEGER NOT NULL,
+        distance REAL NOT NULL,
+        stroke_type TEXT NOT NULL,
+        notes TEXT
+    )
+    ''')
+    conn.executemany(
+        "INSERT INTO swimming_sessions (date, duration, distance, stroke_type, notes) VALUES (?, ?, ?, ?, ?)",
+        [("2024-02-08T10:00:00", 1800, 1500.0, "freestyle", "steady"),
+         ("2024-02-09T10:00:00", 900, 800.0, "backstroke", "")]
+    )
+    conn.commit()
+    conn.close()
+
+def test_legacy_database_is_upgraded(tmp_path):
+    db_path = tmp_path / "swimming.db"
+    make_legacy_db(db_path)
+
+    store = SqliteStore(db_path)
+    manager = MigrationManager(str(db_path))
+    assert manager.current_version(store.conn) == manager.latest_version
+    assert not table_exists(store.conn, "swimming_sessions")
+
+    sessions = store.load()
+    assert [s["total_distance"] for s in sessions] == [1500.0, 800.0]
+    assert sessions[0]["pool_length"] == 25
+    assert sessions[1]["sets"] == [{"distance": 800, "time": 900, "stroke": "backstroke", "repetitions": 1}]
+
+def test_deleted_legacy_ids_are_not_reused(tmp_path):
+    db_path = tmp_path / "swimming.db"
+    make_legacy_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM swimming_sessions WHERE id = 2")
+    conn.commit()
+    conn.close()
+
+    store = SqliteStore(db_path)
+    assert store.next_id() == 3
+
+def test_rollback_restores_legacy_table(tmp_path):
+    db_path = tmp_path / "swimming.db"
+    make_legacy_db(db_path)
+    SqliteStore(db_path).close()
+
+    manager = MigrationManager(str(db_path))
+    assert manager.rollback(0) == 0
+    conn = sqlite3.connect(db_path)
+    assert "pool_length" not in table_columns(conn, "swimming_sessions")
+    assert conn.execute("SELECT count(*) FROM swimming_sessions").fetchone()[0] == 2
+
+def test_failed_migration_rolls_back_everything(tmp_path):
+    db_path = tmp_path / "swimming.db"
+    manager = MigrationManager(str(db_path))
+    manager.migrations.append(Migration(manager.latest_version + 1, up="CREATE TABLE notes (id INTEGER);\nSELECT * FROM missing;", down=""))
+
+    conn = sqlite3.connect(db_path)
+    with pytest.raises(sqlite3.OperationalError):
+        manager.migrate(conn)
+    assert manager.current_version(conn) == 0
+    assert not table_exists(conn, "sessions")
+
+def test_json_history_is_imported_in_batches(tmp_path):
+    sessions = [{"id": i % 50, "date": f"2024-01-{i % 28 + 1:02d}", "sets": [{"stroke": "freestyle", "distance": 100}]}
+                for i in range(120)]
+    (tmp_path / "sessions.json").write_text(json.dumps({"sessions": sessions}))
+
+    db = Database(data_dir=tmp_path, storage="sqlite")
+    imported = db.get_sessions()
+    assert len(imported) == 120
+    assert len({s["id"] for s in imported}) == 120
+    assert db.store.conn.execute("SELECT count(*) FROM sets").fetchone()[0] == 120
+
+def test_json_history_is_imported_only_once(tmp_path):
+    (tmp_path / "sessions.json").write_text(json.dumps({"sessions": [{"id": 1, "date": "2024-02-08", "sets": []}]}))
+    db = Database(data_dir=tmp_path, storage="sqlite")
+    assert db.count_sessions() == 1
+    assert db.delete_session(1)
+    db.store.close()
+
+    reopened = Database(data_dir=tmp_path, storage="sqlite")
+    assert reopened.count_sessions() == 0
+    assert reopened.store.json_imported()
+
+def test_store_that_held_sessions_counts_as_imported(tmp_path):
+    db_path = tmp_path / "swimming.db"
+    store = SqliteStore(db_path)
+    MigrationManager(str(db_path)).rollback(2, store.conn)
+    store.bulk_insert([{"date": "2024-02-08", "sets": []}])
+    store.conn.execute("DELETE FROM sessions")
+    store.conn.commit()
+    store.close()
+
+    assert SqliteStore(db_path).json_imported()
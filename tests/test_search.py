@@ -0,0 +1,57 @@
+from src.utils.database import Database
+from src.utils.search import SearchIndex, tokenize
+
+def make_session(session_id, date, notes="", stroke="freestyle", description=""):
+    return {
+        "id": session_id, "date": date, "notes": notes,
+        "sets": [{"stroke": stroke, "distance": 100, "repetitions": 4, "description": description}],
+    }
+
+def test_tokenize_keeps_dates_and_their_parts():
+    assert tokenize("2024-02-08 Warm-up") == {"2024-02-08", "2024", "02", "08", "warm-up", "warm", "up"}
+
+def test_index_matches_prefixes_of_every_word():
+    index = SearchIndex([
+        make_session(1, "2024-01-05", notes="easy swim"),
+        make_session(2, "2024-02-10", stroke="butterfly", description="drills"),
+        make_session(3, "2024-02-12", notes="Easy recovery", stroke="backstroke"),
+    ], sort_key=lambda s: s["date"])
+    assert [s["id"] for s in index.search("easy")] == [3, 1]
+    assert [s["id"] for s in index.search("2024-02 back")] == [3]
+    assert [s["id"] for s in index.search("DRILL")] == [2]
+    assert index.search("sprint") == []
+    assert index.search("  ") == []
+
+def test_index_follows_updates_and_deletes():
+    index = SearchIndex([make_session(1, "2024-01-05", notes="easy")])
+    index.update(make_session(1, "2024-01-05", notes="hard"))
+    assert index.search("easy") == []
+    index.remove(1)
+    assert index.search("hard") == []
+    assert index.vocabulary == []
+
+def test_database_search_tracks_writes(tmp_path):
+    db = Database(data_dir=tmp_path)
+    db.save_session({"date": "2024-02-08", "notes": "sprint day", "sets": []})
+    assert [s["notes"] for s in db.search("spr")] == ["sprint day"]
+
+    db.save_session({"date": "2024-02-09", "notes": "sprint again", "sets": []})
+    assert [s["date"] for s in db.search("sprint")] == ["2024-02-09", "2024-02-08"]
+
+    db.delete_session(1)
+    assert [s["id"] for s in db.search("sprint")] == [2]
+
+def test_sessions_that_share_a_legacy_id_are_all_found():
+    index = SearchIndex([
+        make_session(1, "2024-01-05", notes="easy"),
+        make_session(1, "2024-01-06", notes="hard"),
+        make_session(2, "2024-01-07", notes="easy"),
+    ], sort_key=lambda s: s["date"])
+    assert [s["date"] for s in index.search("2024")] == ["2024-01-07", "2024-01-06", "2024-01-05"]
+
+    # Like the stores: update replaces the first session with the id, delete drops them all
+    index.update(make_session(1, "2024-01-05", notes="steady"))
+    assert [s["notes"] for s in index.search("2024")] == ["easy", "hard", "steady"]
+    index.remove(1)
+    assert [s["id"] for s in index.search("2024")] == [2]
+    assert "hard" not in index.vocabulary
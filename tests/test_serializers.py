@@ -0,0 +1,101 @@
+import json
+import pytest
+from src.utils import serializers
+from src.utils.database import Database
+from src.utils.synthetic import HistoryConfig, generate
+
+FORMATS = ["json", "json-compact", "columnar"]
+
+def sample_document():
+    sessions = list(generate(HistoryConfig(sessions=30, seed=5)))
+    # Odd shapes an old or hand-edited file may contain
+    sessions.append({"id": 31, "date": "2024-01-01", "sets": [], "pool_length": 33.3,
+                     "flag": True, "extra": {"nested": [1, {"a": None}]}})
+    sessions.append({"date": "2024-01-02"})
+    return {"seq": 4, "sessions": sessions}
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_round_trip_and_detection(format):
+    document = sample_document()
+    data = serializers.dumps(document, format)
+    assert serializers.loads(data) == document
+    assert serializers.loads(serializers.dumps(document["sessions"], format)) == document["sessions"]
+    assert serializers.detect(data).name in (format, "json-compact")
+
+def test_columnar_is_smaller_and_rows_share_no_containers():
+    document = sample_document()
+    assert len(serializers.dumps(document, "columnar")) < len(serializers.dumps(document, "json")) / 2
+    sessions = serializers.loads(serializers.dumps(document, "columnar"))["sessions"]
+    mixed = [s["mixed_strokes"] for session in sessions for s in session.get("sets", [])
+             if "mixed_strokes" in s]
+    assert len({id(strokes) for strokes in mixed}) == len(mixed) > 1
+
+def test_msgpack_round_trip():
+    pytest.importorskip("msgpack")
+    document = sample_document()
+    assert serializers.loads(serializers.dumps(document, "msgpack")) == document
+
+def test_convert_both_ways_and_database_reads_any_format(tmp_path):
+    db = Database(data_dir=tmp_path)
+    db.save_session({"date": "2024-02-08", "sets": [{"stroke": "mix", "mixed_strokes": ["freestyle"]}]})
+    original = db.get_sessions()
+
+    serializers.convert(db.sessions_file, "columnar")
+    assert db.sessions_file.read_bytes().startswith(serializers.ColumnarSerializer.MAGIC)
+    assert Database(data_dir=tmp_path).get_sessions() == original
+
+    serializers.convert(db.sessions_file, "json", tmp_path / "back.json")
+    assert json.loads((tmp_path / "back.json").read_text())["sessions"] == original
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        serializers.dumps({"sessions": []}, "yaml")
+    with pytest.raises(ValueError):
+        serializers.loads(b"\x00garbage")
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_streaming_writer_matches_the_serializers(compact):
+    import io
+    document = sample_document()
+    meta = {"seq": document["seq"]}
+    file = io.StringIO()
+    assert serializers.write_json_sessions(file, document["sessions"], meta, compact) == 32
+    expected = {"sessions": document["sessions"], "seq": document["seq"]}
+    assert file.getvalue().encode() == serializers.dumps(expected, "json-compact" if compact else "json")
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 16])
+def test_streaming_reader_handles_both_layouts(chunk_size):
+    import io
+    document = sample_document()
+    meta = {}
+    text = serializers.dumps(document, "json").decode()
+    assert list(serializers.iter_json_sessions(io.StringIO(text), meta, chunk_size)) == document["sessions"]
+    assert meta == {"seq": 4}
+    legacy = json.dumps(document["sessions"])
+    assert list(serializers.iter_json_sessions(io.StringIO(legacy), None, chunk_size)) == document["sessions"]
+
+def test_streaming_reader_rejects_truncated_files():
+    import io
+    with pytest.raises(ValueError):
+        list(serializers.iter_json_sessions(io.StringIO('{"sessions": [{"id": 1}, {"id"'), chunk_size=4))
+
+def test_iter_sessions_memory_does_not_grow_with_the_file(tmp_path):
+    import tracemalloc
+    path = tmp_path / "sessions.json"
+    with open(path, "w", encoding="utf-8") as file:
+        serializers.write_json_sessions(file, generate(HistoryConfig(sessions=3000)), compact=True)
+    tracemalloc.start()
+    count = sum(1 for _ in serializers.iter_sessions(path))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert count == 3000
+    assert peak < path.stat().st_size / 4
+
+@pytest.mark.parametrize("storage", ["json", "sqlite"])
+def test_stream_sessions_pages_through_everything(tmp_path, storage):
+    from src.utils.synthetic import load_history
+    load_history(tmp_path, HistoryConfig(sessions=23, seed=1), storage)
+    db = Database(data_dir=tmp_path, storage=storage)
+    expected = [s["id"] for s in db.iter_sessions("desc")]
+    assert [s["id"] for s in db.stream_sessions("desc", page_size=5)] == expected
+    assert len(expected) == 23
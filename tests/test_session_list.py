@@ -0,0 +1,32 @@
+from src.gui.components.session_list import (
+    CARD_BASE_HEIGHT, CARD_GAP, SET_LINE_HEIGHT, ListLayout, card_height
+)
+
+def test_card_height_grows_with_sets():
+    session = {"sets": [{}, {}, {}]}
+    assert card_height(session) == CARD_BASE_HEIGHT + 3 * SET_LINE_HEIGHT + CARD_GAP
+
+def test_visible_range_covers_only_viewport_plus_overscan():
+    layout = ListLayout([100] * 10_000)
+    assert layout.total_height == 1_000_000
+
+    assert layout.visible_range(0, 500, overscan=0) == range(0, 6)
+    assert layout.visible_range(250_050, 250_550, overscan=2) == range(2498, 2508)
+    assert layout.visible_range(999_900, 1_000_400, overscan=2) == range(9997, 10_000)
+
+def test_visible_range_with_variable_heights():
+    layout = ListLayout([50, 200, 50, 50])
+    assert layout.offsets == [0, 50, 250, 300, 350]
+    assert layout.visible_range(60, 240, overscan=0) == range(1, 2)
+    assert len(ListLayout().visible_range(0, 100)) == 0
+
+def test_layout_edits_only_shift_following_rows():
+    layout = ListLayout([50, 60, 70])
+    layout.insert(1, 40)
+    assert layout.offsets == [0, 50, 90, 150, 220]
+    layout.resize(0, 30)
+    assert layout.offsets == [0, 30, 70, 130, 200]
+    layout.remove(2)
+    assert layout.offsets == [0, 30, 70, 140]
+    layout.insert(3, 10)
+    assert layout.offsets == [0, 30, 70, 140, 150]
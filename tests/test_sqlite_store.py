@@ -0,0 +1,78 @@
+import pytest
+from src.data.database import Database as HistoryDatabase, SqliteStore
+from src.utils.database import Database
+
+def make_session(date="2024-02-08"):
+    return {
+        "date": date,
+        "pool_length": 25,
+        "sets": [
+            {"distance": 100, "repetitions": 4, "stroke": "freestyle", "description": "warm up"},
+            {"distance": 50, "repetitions": 2, "stroke": "mix", "mixed_strokes": ["butterfly", "backstroke"]},
+        ],
+        "total_distance": 500,
+        "total_time": 0,
+        "notes": "easy",
+    }
+
+def test_sessions_round_trip(tmp_path):
+    db = Database(data_dir=tmp_path, storage="sqlite")
+    assert db.save_session(make_session())
+    stored = db.get_sessions()[0]
+    expected = dict(make_session(), id=stored["id"], created_at=stored["created_at"])
+    assert stored == expected
+
+def test_update_and_delete_touch_one_session(tmp_path):
+    db = Database(data_dir=tmp_path, storage="sqlite")
+    db.save_session(make_session())
+    db.save_session(make_session("2024-02-09"))
+
+    edited = dict(make_session("2024-02-10"), id=1, sets=[{"distance": 25, "stroke": "butterfly"}])
+    assert db.update_session(edited)
+    assert db.delete_session(2)
+    assert not db.delete_session(2)
+
+    sessions = db.get_sessions()
+    assert [s["date"] for s in sessions] == ["2024-02-10"]
+    assert sessions[0]["sets"] == [{"distance": 25, "stroke": "butterfly"}]
+    count = db.store.conn.execute("SELECT count(*) FROM sets").fetchone()[0]
+    assert count == 1
+
+def test_store_uses_wal_and_indexes(tmp_path):
+    store = SqliteStore(tmp_path / "swimming.db")
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[1] for row in store.conn.execute("SELECT * FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_sessions_date", "idx_sets_stroke"} <= indexes
+
+def test_history_database_shares_the_engine(tmp_path):
+    db = HistoryDatabase(tmp_path, storage="sqlite")
+    db.add_session(1800, 1500.0, "freestyle", "steady")
+    rows = db.get_all_sessions()
+    assert rows[0][2:] == (1800, 1500.0, "freestyle", "steady")
+
+    sessions = Database(data_dir=tmp_path, storage="sqlite").get_sessions()
+    assert sessions[0]["sets"][0]["stroke"] == "freestyle"
+
+def test_history_pages_follow_date_order(tmp_path):
+    db = HistoryDatabase(tmp_path, storage="sqlite")
+    for day in range(1, 8):
+        db.store.insert({"date": f"2024-02-0{day}", "sets": [{"stroke": "freestyle"}]})
+    first = db.get_sessions_page(limit=3)
+    second = db.get_sessions_page(limit=3, before=(first[-1][1], first[-1][0]))
+    assert [row[1] for row in first + second] == [f"2024-02-0{d}" for d in range(7, 1, -1)]
+    assert db.count_sessions() == 7
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite"])
+def test_history_and_main_window_see_the_same_sessions(tmp_path, storage):
+    history = HistoryDatabase(tmp_path, storage=storage)
+    history.add_session(1800, 1500.0, "freestyle", "steady")
+    db = Database(data_dir=tmp_path, storage=storage)
+    assert [s["notes"] for s in db.get_sessions()] == ["steady"]
+
+    db.save_session({"date": "2030-01-01", "sets": [{"stroke": "butterfly"}], "notes": "later"})
+    assert [row[4:] for row in history.get_sessions_page(limit=5)] == [
+        ("butterfly", "later"), ("freestyle", "steady")
+    ]
+    assert history.count_sessions() == 2
+    if hasattr(db.store, "close"):
+        db.store.close()
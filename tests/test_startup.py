@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("customtkinter")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Self import time allowed for the app's own modules on the way to the main window
+SRC_IMPORT_BUDGET_MS = 40
+# Loaded only when a chart, analytics or SQLite storage is first needed
+DEFERRED_MODULES = ("matplotlib", "numpy", "sqlite3", "src.models.analytics", "src.gui.stats_window")
+
+def import_times(module: str) -> dict:
+    """Self import time in microseconds per module, from ``python -X importtime``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = int(self_us)
+    return times
+
+def test_app_import_defers_heavy_modules():
+    # src.main, not just the main window: it also creates the history Database
+    times = import_times("src.main")
+    assert "src.gui.main_window" in times
+    loaded = [name for name in times if name.split(".")[0] in DEFERRED_MODULES or name in DEFERRED_MODULES]
+    assert loaded == []
+
+def test_app_import_stays_within_budget():
+    times = import_times("src.main")
+    own = sum(us for name, us in times.items() if name == "src" or name.startswith("src."))
+    assert own / 1000 < SRC_IMPORT_BUDGET_MS
@@ -1 +1,81 @@
+from src.models.stats import StatsAggregates, bucket_start, parse_day
+from src.utils.database import Database
 
+def make_session(session_id, date, sets=(), distance=None):
+    sets = [{"stroke": stroke, "distance": d, "time": 60, "repetitions": reps} for stroke, d, reps in sets]
+    total = distance if distance is not None else sum(s["distance"] * s["repetitions"] for s in sets)
+    return {"id": session_id, "date": date, "sets": sets, "total_distance": total, "total_time": 600}
+
+def test_bucket_start_rounds_down_to_period():
+    day = parse_day("2024-02-08")
+    assert bucket_start(day, "day") == "2024-02-08"
+    assert bucket_start(day, "week") == "2024-02-05"
+    assert bucket_start(day, "month") == "2024-02-01"
+    assert parse_day("not a date") is None
+
+def test_aggregates_bucket_by_period_and_stroke():
+    stats = StatsAggregates([
+        make_session(1, "2024-02-05", [("freestyle", 100, 4)]),
+        make_session(2, "2024-02-08", [("freestyle", 50, 2), ("butterfly", 50, 4)]),
+        make_session(3, "2024-03-01", [("backstroke", 200, 1)]),
+    ])
+    assert stats.total().sessions == 3
+    assert stats.total().distance == 900
+    assert stats.total("freestyle").distance == 500
+    assert stats.total("freestyle").sessions == 2
+    assert stats.series("week") == [
+        ("2024-02-05", stats.buckets[("week", "2024-02-05", None)]),
+        ("2024-02-26", stats.buckets[("week", "2024-02-26", None)]),
+    ]
+    assert [start for start, _ in stats.series("month")] == ["2024-02-01", "2024-03-01"]
+    assert stats.range_total("day", "2024-02-06", "2024-03-31").distance == 500
+    assert stats.strokes() == ["backstroke", "butterfly", "freestyle"]
+
+def test_aggregates_follow_updates_and_deletes():
+    stats = StatsAggregates([make_session(1, "2024-02-05", [("freestyle", 100, 4)])])
+    stats.update(make_session(1, "2024-03-05", [("breaststroke", 100, 2)]))
+    assert stats.total().distance == 200
+    assert stats.series("month")[0][0] == "2024-03-01"
+    assert stats.total("freestyle").sessions == 0
+    stats.remove(1)
+    assert stats.buckets == {}
+
+def test_database_stats_track_writes(tmp_path):
+    db = Database(data_dir=tmp_path)
+    db.save_session(make_session(None, "2024-02-05", [("freestyle", 100, 4)]))
+    assert db.get_stats().total().distance == 400
+
+    db.save_session(make_session(None, "2024-02-06", distance=1000))
+    session = dict(db.get_session(1), total_distance=100)
+    db.update_session(session)
+    stats = db.get_stats()
+    assert stats.total().distance == 1100
+    assert stats.total().sessions == 2
+
+    db.delete_session(2)
+    assert db.get_stats().total().distance == 100
+
+def test_aggregates_count_sessions_that_share_a_legacy_id():
+    stats = StatsAggregates([
+        make_session(1, "2024-02-05", distance=1000),
+        make_session(1, "2024-02-06", distance=1000),
+        make_session(2, "2024-02-07", distance=1000),
+    ])
+    assert (stats.total().sessions, stats.total().distance) == (3, 3000)
+
+    # Like the stores: update replaces the first session with the id, delete drops them all
+    stats.update(make_session(1, "2024-02-05", distance=500))
+    assert (stats.total().sessions, stats.total().distance) == (3, 2500)
+    stats.remove(1)
+    assert (stats.total().sessions, stats.total().distance) == (1, 1000)
+
+def test_stroke_buckets_are_summed_on_first_use():
+    stats = StatsAggregates([make_session(1, "2024-02-05", [("freestyle", 100, 4)])])
+    stats.add(make_session(2, "2024-02-06", [("butterfly", 50, 2)]))
+    snapshot = stats.copy()
+    assert snapshot.strokes() == ["butterfly", "freestyle"]
+    assert ("all", True) not in stats.views
+
+    stats.remove(2)
+    assert stats.strokes() == ["freestyle"]
+    assert snapshot.total("butterfly").distance == 100
@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from src.gui.components.stats_charts import SessionCharts
+
+def test_update_reuses_artists_and_rescales():
+    charts = SessionCharts()
+    FigureCanvasAgg(charts.figure)
+    line, scatter = charts.distance_line, charts.time_scatter
+
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(10)]
+    charts.update(days, [100 * i for i in range(10)], [60 * i for i in range(10)])
+    charts.figure.canvas.draw()
+    assert charts.distance_axes.get_ylim()[1] >= 900
+    assert charts.scatter_axes.get_xlim()[1] >= 900
+
+    charts.update(days[:2], [10, 20], [5, 6])
+    assert charts.distance_line is line and charts.time_scatter is scatter
+    assert charts.distance_axes.get_ylim()[1] < 100
+    assert charts.scatter_axes.get_ylim()[1] < 10
+    assert len(charts.time_scatter.get_offsets()) == 2
+
+def test_update_with_no_sessions():
+    charts = SessionCharts()
+    charts.update([], [], [])
+    assert len(charts.distance_line.get_xdata()) == 0
+    assert len(charts.time_scatter.get_offsets()) == 0
+
+def test_points_drawn_scale_with_pixels_not_history():
+    charts = SessionCharts(figsize=(6, 3))
+    FigureCanvasAgg(charts.figure)
+    days = [date(2000, 1, 1) + timedelta(days=i) for i in range(20_000)]
+    distances = [1000 + (i * 37) % 3000 for i in range(20_000)]
+    charts.update(days, distances, [d * 1.5 for d in distances])
+
+    width = charts.distance_axes.get_window_extent().width
+    assert len(charts.distance_line.get_xdata()) <= width
+    assert len(charts.time_scatter.get_offsets()) < 20_000
+    # Autoscaling still covers the full data
+    assert charts.distance_axes.get_ylim()[1] >= max(distances)
@@ -0,0 +1,36 @@
+import pytest
+from src.utils.database import Database
+from src.utils.synthetic import HistoryConfig, generate, load_history
+
+def test_generate_is_deterministic_and_dated_in_order():
+    config = HistoryConfig(sessions=200, seed=3)
+    sessions = list(generate(config))
+    assert sessions == list(generate(HistoryConfig(sessions=200, seed=3)))
+    assert sessions != list(generate(HistoryConfig(sessions=200, seed=4)))
+    assert [s["id"] for s in sessions] == list(range(1, 201))
+    assert [s["date"] for s in sessions] == sorted(s["date"] for s in sessions)
+    assert sessions[-1]["date"] <= config.end.isoformat()
+
+def test_generated_sessions_match_the_session_schema():
+    for session in generate(HistoryConfig(sessions=100, seed=1)):
+        sets = session["sets"]
+        assert 3 <= len(sets) <= 10
+        assert session["total_distance"] == sum(s["distance"] * s["repetitions"] for s in sets)
+        assert session["total_time"] == sum(s["time"] * s["repetitions"] for s in sets)
+        for set_data in sets:
+            assert set_data["distance"] % session["pool_length"] == 0
+            assert ("mixed_strokes" in set_data) == (set_data["stroke"] == "mix")
+
+def test_large_histories_stay_within_max_years():
+    config = HistoryConfig(sessions=20000, sessions_per_week=1, max_years=2)
+    first = next(generate(config))
+    assert first["date"] >= "2022-12-01"
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite"])
+def test_load_history_is_readable_by_every_backend(tmp_path, storage):
+    config = HistoryConfig(sessions=50, seed=2)
+    assert load_history(tmp_path, config, storage) == 50
+    db = Database(data_dir=tmp_path, storage=storage)
+    assert [s["id"] for s in db.get_sessions()] == list(range(1, 51))
+    assert db.save_session({"date": "2025-01-01", "sets": []})
+    assert max(s["id"] for s in db.get_sessions()) == 51